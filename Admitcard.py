@@ -1,20 +1,44 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
 import os
-import re
+from itertools import islice
+from PIL import ImageTk
 
-ADMIT_TEMPLATE = "AdmitCard.jpg"  # Path to your admit card template image
+from ingest import CHUNK_ROWS, iter_chunks, iter_records
+from jobs import JobRunner
+from layout import draw_preview, load_plan
+from render import ADMIT_LAYOUT, ADMIT_TEMPLATE, ADMIT_CARDS_DIR, render_admit_card, render_admit_cards, render_admit_cards_pdf
+from validation import iter_valid_admit_records, validate_admit_batch, validate_admit_fields
+
+# "Generate All" output choices: label -> combine mode (None = one JPG per student)
+OUTPUT_MODES = {
+    "Separate JPGs": None,
+    "One PDF": "batch",
+    "PDF per Subject & Year": "group",
+}
+MAX_ERRORS_SHOWN = 20  # Validation errors listed in the summary message
+PREVIEW_WIDTH = 900  # Width of the on-screen admit card preview in pixels
 
 class AdmitCardGenerator:
     def __init__(self, root):
         self.root = root
         self.root.title("Admit Card Generator")
-        self.root.geometry("2480x1146")
+        self.root.geometry("960x980")
         self.imported_data = None
+        self.import_path = None
+        self.import_rows = None
         self.current_student_index = 0
+        self.jobs = JobRunner(self.root)
+        self.job = None
+        self.preview_image = None  # Keeps the PhotoImage alive while it is shown
         self.create_widgets()
+        self.update_preview()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        # Cancel a running batch first; its callbacks would otherwise touch destroyed widgets
+        self.jobs.close()
+        self.root.destroy()
 
     def create_widgets(self):
         top_frame = ttk.Frame(self.root)
@@ -32,6 +56,7 @@ class AdmitCardGenerator:
             ttk.Label(admit_frame, text=f"{label}:").grid(row=i, column=0, padx=5, pady=5, sticky="e")
             entry = ttk.Entry(admit_frame)
             entry.grid(row=i, column=1, padx=5, pady=5, sticky="ew")
+            entry.bind("<KeyRelease>", self.update_preview)
             self.admit_entries[label] = entry
 
         exam_frame = ttk.LabelFrame(self.root, text="Annual Examination")
@@ -44,6 +69,7 @@ class AdmitCardGenerator:
             ttk.Label(exam_frame, text=f"{label}:").grid(row=i, column=0, padx=5, pady=5, sticky="e")
             entry = ttk.Entry(exam_frame)
             entry.grid(row=i, column=1, padx=5, pady=5, sticky="ew")
+            entry.bind("<KeyRelease>", self.update_preview)
             self.exam_entries[label] = entry
 
         self.exam_entries["Date"].insert(0, "23.06.2024")
@@ -58,8 +84,21 @@ class AdmitCardGenerator:
         next_btn.pack(side="left", padx=5)
         generate_btn = ttk.Button(nav_frame, text="Generate Admit Card", command=self.generate_admit_card)
         generate_btn.pack(side="right", padx=5)
-        generate_all_btn = ttk.Button(nav_frame, text="Generate All Admit Cards", command=self.generate_all_admit_cards)
-        generate_all_btn.pack(side="right", padx=5)
+        self.cancel_btn = ttk.Button(nav_frame, text="Cancel", command=self.cancel_generation, state="disabled")
+        self.cancel_btn.pack(side="right", padx=5)
+        self.generate_all_btn = ttk.Button(nav_frame, text="Generate All Admit Cards",
+                                           command=self.generate_all_admit_cards)
+        self.generate_all_btn.pack(side="right", padx=5)
+        self.output_mode = ttk.Combobox(nav_frame, values=list(OUTPUT_MODES), state="readonly", width=22)
+        self.output_mode.set("Separate JPGs")
+        self.output_mode.pack(side="right", padx=5)
+        self.progress = ttk.Progressbar(nav_frame, mode="determinate", length=300)
+        self.progress.pack(side="right", padx=5)
+
+        preview_frame = ttk.LabelFrame(self.root, text="PREVIEW")
+        preview_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.preview_label = ttk.Label(preview_frame)
+        self.preview_label.pack()
 
     def import_list(self):
         filetypes = [("Excel files", "*.xlsx"), ("CSV files", "*.csv")]
@@ -67,29 +106,53 @@ class AdmitCardGenerator:
         if not filename:
             return
         try:
-            if filename.lower().endswith('.csv'):
-                df = pd.read_csv(filename)
-            else:
-                df = pd.read_excel(filename)
-            self.imported_data = df
+            # Only the first chunk is read now; more rows are fetched while navigating
+            self.import_path = filename
+            self.import_rows = iter_records(iter_chunks(filename))
+            self.imported_data = []
             self.current_student_index = 0
+            self.fetch_rows(1)
             self.load_student_data()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to import file: {str(e)}")
 
+    def fetch_rows(self, count):
+        """Read further chunks of the imported file until at least count rows are loaded."""
+        while self.import_rows is not None and len(self.imported_data) < count:
+            chunk = list(islice(self.import_rows, CHUNK_ROWS))
+            if not chunk:
+                self.import_rows = None
+            self.imported_data.extend(chunk)
+
     def load_student_data(self):
         if self.imported_data is None or self.current_student_index >= len(self.imported_data):
             return
-        row = self.imported_data.iloc[self.current_student_index]
+        row = self.imported_data[self.current_student_index]
         for label in self.admit_labels:
             value = str(row[label]) if label in row else ""
             self.admit_entries[label].delete(0, tk.END)
             self.admit_entries[label].insert(0, value)
+        self.update_preview()
+
+    def update_preview(self, event=None):
+        """
+        Draw the form's current values onto a cached, downscaled template.
+        Takes a few milliseconds, so it runs on every navigation and keystroke.
+        """
+        plan = load_plan(ADMIT_LAYOUT)
+        if not os.path.exists(plan.template):
+            return
+        admit_data = {label: self.admit_entries[label].get().strip() for label in self.admit_labels}
+        exam_data = {label: self.exam_entries[label].get().strip() for label in self.exam_labels}
+        img = draw_preview(plan, [plan.row({**admit_data, **exam_data})], PREVIEW_WIDTH)
+        self.preview_image = ImageTk.PhotoImage(img, master=self.root)
+        self.preview_label.config(image=self.preview_image)
 
     def next_student(self):
         if self.imported_data is None:
             messagebox.showwarning("Warning", "No list imported!")
             return
+        self.fetch_rows(self.current_student_index + 2)
         if self.current_student_index < len(self.imported_data) - 1:
             self.current_student_index += 1
             self.load_student_data()
@@ -103,27 +166,7 @@ class AdmitCardGenerator:
             self.load_student_data()
 
     def validate_fields(self, admit_data, exam_data):
-        if not admit_data["Roll No."] or not re.match(r"^[\w/]+$", admit_data["Roll No."]):
-            return False, "Invalid Roll No. (should be non-empty and alphanumeric)"
-        if not admit_data["Name"] or not re.match(r"^[A-Za-z .'-]+$", admit_data["Name"]):
-            return False, "Invalid Name (should contain only letters and spaces)"
-        if not admit_data["Examination for"]:
-            return False, "Examination for field cannot be empty"
-        if not admit_data["Year"]:
-            return False, "Year field cannot be empty"
-        if not admit_data["Subject"]:
-            return False, "Subject field cannot be empty"
-        if not admit_data["Name of the Centre with Address"]:
-            return False, "Centre/Address field cannot be empty"
-        if not re.match(r"^\d{2}\.\d{2}\.\d{4}$", exam_data["Date"]):
-            return False, "Date must be in DD.MM.YYYY format"
-        if not exam_data["Time (1st Part)"]:
-            return False, "Time (1st Part) cannot be empty"
-        if not exam_data["Time (2nd Part)"]:
-            return False, "Time (2nd Part) cannot be empty"
-        if not exam_data["Place"]:
-            return False, "Place field cannot be empty"
-        return True, ""
+        return validate_admit_fields(admit_data, exam_data)
 
     def generate_admit_card(self):
         admit_data = {label: self.admit_entries[label].get().strip() for label in self.admit_labels}
@@ -139,89 +182,76 @@ class AdmitCardGenerator:
         if self.imported_data is None:
             messagebox.showwarning("Warning", "No list imported!")
             return
+        if not os.path.exists(ADMIT_TEMPLATE):
+            messagebox.showerror("Error", f"Template image '{ADMIT_TEMPLATE}' not found.")
+            return
+        if self.job is not None:
+            return
         exam_data = {label: self.exam_entries[label].get().strip() for label in self.exam_labels}
-        for idx, row in self.imported_data.iterrows():
-            admit_data = {label: str(row[label]) if label in row else "" for label in self.admit_labels}
-            valid, msg = self.validate_fields(admit_data, exam_data)
-            if not valid:
-                messagebox.showerror("Validation Error", f"Row {str(idx)}: {msg}")
-                continue
-            self.save_admit_card_image(admit_data, exam_data)
-        messagebox.showinfo("Success", "All admit cards generated as JPG.")
+        combine = OUTPUT_MODES[self.output_mode.get()]
+        path = self.import_path
+        report = None
+
+        def work(progress):
+            nonlocal report
+            # The whole list is validated, duplicates included, before the first card is drawn;
+            # the file is then streamed again for rendering, skipping the rejected rows
+            report = validate_admit_batch(iter_records(iter_chunks(path)), exam_data)
+            progress(0, report.valid)
+            records = iter_valid_admit_records(iter_records(iter_chunks(path)), report)
+            if combine:
+                return render_admit_cards_pdf(records, exam_data, combine=combine, progress=progress,
+                                              total=report.valid)
+            return render_admit_cards(records, exam_data, progress=progress, total=report.valid)
+
+        def done(paths):
+            self.finish_generation()
+            self.show_errors(report)
+            messagebox.showinfo("Success", f"All admit cards generated as {'PDF' if combine else 'JPG'}.",
+                                parent=self.root)
+
+        def failed(e):
+            self.finish_generation()
+            messagebox.showerror("Error", f"Failed to generate admit cards: {e}", parent=self.root)
+
+        def cancelled():
+            self.finish_generation()
+            messagebox.showinfo("Cancelled", "Admit card generation cancelled.", parent=self.root)
+
+        self.progress["value"] = 0
+        self.generate_all_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.job = self.jobs.submit(work, name="admit_cards", on_progress=self.update_progress, on_done=done,
+                                    on_error=failed, on_cancel=cancelled)
+
+    def cancel_generation(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def finish_generation(self):
+        self.job = None
+        self.generate_all_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+
+    def show_errors(self, report):
+        """Report all rejected rows in one message."""
+        if report.ok:
+            return
+        messagebox.showerror("Validation Error",
+                             f"{len(report.errors)} row(s) skipped:\n" + "\n".join(report.lines(MAX_ERRORS_SHOWN)),
+                             parent=self.root)
+
+    def update_progress(self, done, total):
+        self.progress["maximum"] = max(total or 0, done, 1)
+        self.progress["value"] = done
 
     def save_admit_card_image(self, admit_data, exam_data):
         if not os.path.exists(ADMIT_TEMPLATE):
             messagebox.showerror("Error", f"Template image '{ADMIT_TEMPLATE}' not found.")
             return
-        img = Image.open(ADMIT_TEMPLATE).convert("RGB")
-        draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("arial.ttf", 48)
-            font_bold = ImageFont.truetype("arialbd.ttf", 48)
-        except:
-            font = ImageFont.load_default()
-            font_bold = font
-
-        # --- Alignment based on your marked reference image ---
-        # Roll No. (top right, red)
-        roll_text = admit_data["Roll No."]
-        roll_x, roll_y = 761, 303
-        draw.text((roll_x, roll_y), roll_text, font=font_bold, fill="black")
-
-        # Name (Sri/Sm./Km.) (left, black)
-        name_text = admit_data["Name"]
-        name_x, name_y = 680, 421
-        draw.text((name_x, name_y), name_text, font=font, fill="black")
-
-        # Examination for (left, black)
-        exam_for_text = admit_data["Examination for"]
-        exam_for_x, exam_for_y = 840, 511
-        draw.text((exam_for_x, exam_for_y), exam_for_text, font=font, fill="black")
-
-        # Year (left, black)
-        year_text = admit_data["Year"]
-        year_x, year_y = 460, 620
-        draw.text((year_x, year_y), year_text, font=font, fill="black")
-
-        # Subject (left, black)
-        subject_text = admit_data["Subject"]
-        subject_x, subject_y = 1001, 621
-        draw.text((subject_x, subject_y), subject_text, font=font, fill="black")
-
-        # Name of the Centre with Address (left, black)
-        centre_text = admit_data["Name of the Centre with Address"]
-        centre_x, centre_y = 380, 800
-        draw.text((centre_x, centre_y), centre_text, font=font, fill="black")
-
-        # Date (right, black)
-        date_text = exam_data["Date"]
-        date_x, date_y = 1743, 387
-        draw.text((date_x, date_y), date_text, font=font, fill="black")
-
-        # Time (1st Part) (right, black)
-        time1_text = exam_data["Time (1st Part)"]
-        time1_x, time1_y = 1780, 540
-        draw.text((time1_x, time1_y), time1_text, font=font, fill="black")
-
-        # Time (2nd Part) (right, black)
-        time2_text = exam_data["Time (2nd Part)"]
-        time2_x, time2_y = 1799, 680
-        draw.text((time2_x, time2_y), time2_text, font=font, fill="black")
-
-        # Place (right, black)
-        place_text = exam_data["Place"]
-        place_x, place_y = 1600, 883
-        draw.text((place_x, place_y), place_text, font=font, fill="black")
-
-        out_dir = os.path.join(os.getcwd(), "ADMIT CARDS")
-        if not os.path.exists(out_dir):
-            os.makedirs(out_dir)
-        roll = admit_data["Roll No."].replace("/", "_")
-        name = admit_data["Name"].replace(" ", "_")
-        out_path = os.path.join(out_dir, f"{roll}_{name}_admit_card.jpg")
-        img.save(out_path, "JPEG")
+        render_admit_card(admit_data, exam_data, ADMIT_CARDS_DIR)
 
 def open_admit_card_window():
+    # The Toplevel runs on the main window's event loop
     root = tk.Toplevel()
     AdmitCardGenerator(root)
-    root.mainloop()
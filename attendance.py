@@ -1,34 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
 import os
 
-# Path to the attendance sheet template image
-ATTENDANCE_TEMPLATE = "attendance_sheet.jpg"  # Use your provided template
-
-# Coordinates for each field (adjust as needed for your template)
-# The y-coordinates are for the first row; each subsequent row is offset by ROW_HEIGHT
-FIELD_COORDS = {
-    "Roll No.": (120, 590),   # x, y for Roll No. cell (first row)
-    "Name": (381, 590),      # x, y for Name cell (first row)
-    "Year": (1163, 590),      # x, y for Year cell (first row) -- adjust as needed
-}
-ROW_HEIGHT = 106  # Vertical space between rows; adjust as per your template
-MAX_ROWS_PER_SHEET = 26  # Number of students per sheet; adjust as per your template
-
-# Font settings (adjust path/size as needed)
-try:
-    FONT = ImageFont.truetype("arial.ttf", 48)
-except:
-    FONT = ImageFont.load_default()
+from ingest import iter_chunks, read_header
+from jobs import JobRunner
+from layout import load_plan
+from render import ATTENDANCE_SHEETS_DIR, ATTENDANCE_LAYOUT, map_attendance_columns, render_attendance_sheets
 
 class AttendanceSheetApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Attendance Sheet Generator")
-        self.root.geometry("500x180")
+        self.root.geometry("500x210")
+        self.jobs = JobRunner(self.root)
+        self.job = None
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        # Cancel a running batch first; its callbacks would otherwise touch destroyed widgets
+        self.jobs.close()
+        self.root.destroy()
 
     def create_widgets(self):
         frame = ttk.Frame(self.root, padding=20)
@@ -44,7 +36,12 @@ class AttendanceSheetApp:
 
         frame2 = ttk.Frame(self.root, padding=20)
         frame2.pack(fill="x")
-        ttk.Button(frame2, text="Generate Attendance Sheets", command=self.generate_sheets).pack()
+        self.generate_btn = ttk.Button(frame2, text="Generate Attendance Sheets", command=self.generate_sheets)
+        self.generate_btn.pack(side="left")
+        self.cancel_btn = ttk.Button(frame2, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
+        self.status = ttk.Label(frame2, text="")
+        self.status.pack(side="left", padx=5)
 
     def browse_file(self):
         file_path = filedialog.askopenfilename(
@@ -61,61 +58,56 @@ class AttendanceSheetApp:
             messagebox.showerror("Error", "Please select a valid Excel or CSV file.")
             return
 
-        # Read required columns from Excel/CSV
+        # Read the header only; rows are streamed in chunks while rendering
         try:
-            if file_path.lower().endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+            columns = read_header(file_path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read file: {e}")
             return
 
         # Map columns (case-insensitive, robust to naming)
-        col_map = {}
-        for col in df.columns:
-            col_lower = col.strip().lower()
-            if "roll" in col_lower:
-                col_map["Roll No."] = col
-            elif "name" in col_lower and "guardian" not in col_lower and "father" not in col_lower:
-                col_map["Name"] = col
-            elif "year" in col_lower:
-                col_map["Year"] = col
-
-        required_fields = list(FIELD_COORDS.keys())
+        col_map = map_attendance_columns(columns)
+
+        required_fields = load_plan(ATTENDANCE_LAYOUT).field_names
         missing = [k for k in required_fields if k not in col_map]
         if missing:
             messagebox.showerror("Error", f"Missing columns in file: {', '.join(missing)}")
             return
 
-        # Output directory
-        out_dir = os.path.join(os.getcwd(), "ATTENDANCE_SHEETS")
-        os.makedirs(out_dir, exist_ok=True)
-
-        total_students = len(df)
-        sheet_count = 0
-        for start_idx in range(0, total_students, MAX_ROWS_PER_SHEET):
-            img = Image.open(ATTENDANCE_TEMPLATE).convert("RGB")
-            draw = ImageDraw.Draw(img)
-            end_idx = min(start_idx + MAX_ROWS_PER_SHEET, total_students)
-            for row_num, idx in enumerate(range(start_idx, end_idx)):
-                row = df.iloc[idx]
-                y_offset = row_num * ROW_HEIGHT
-                # Draw Roll No., Name, and Year in perfect alignment
-                roll_value = "" if pd.isna(row[col_map["Roll No."]]) else str(row[col_map["Roll No."]])
-                name_value = "" if pd.isna(row[col_map["Name"]]) else str(row[col_map["Name"]])
-                year_value = "" if pd.isna(row[col_map["Year"]]) else str(row[col_map["Year"]])
-                draw.text((FIELD_COORDS["Roll No."][0], FIELD_COORDS["Roll No."][1] + y_offset), roll_value, font=FONT, fill="black")
-                draw.text((FIELD_COORDS["Name"][0], FIELD_COORDS["Name"][1] + y_offset), name_value, font=FONT, fill="black")
-                draw.text((FIELD_COORDS["Year"][0], FIELD_COORDS["Year"][1] + y_offset), year_value, font=FONT, fill="black")
-            # Save the sheet
-            sheet_count += 1
-            out_path = os.path.join(out_dir, f"attendance_sheet_{sheet_count}.jpg")
-            img.save(out_path, "JPEG")
-
-        messagebox.showinfo("Success", f"{sheet_count} attendance sheet(s) generated in {out_dir}")
+        out_dir = ATTENDANCE_SHEETS_DIR
+
+        def done(paths):
+            self.finish()
+            messagebox.showinfo("Success", f"{len(paths)} attendance sheet(s) generated in {out_dir}", parent=self.root)
+
+        def failed(e):
+            self.finish()
+            messagebox.showerror("Error", f"Failed to generate attendance sheets: {e}", parent=self.root)
+
+        def cancelled():
+            self.finish()
+            self.status.config(text="Cancelled")
+
+        self.generate_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.job = self.jobs.submit(render_attendance_sheets, iter_chunks(file_path), col_map, out_dir,
+                                    on_progress=self.update_progress, on_done=done,
+                                    on_error=failed, on_cancel=cancelled)
+
+    def update_progress(self, done, total):
+        self.status.config(text=f"{done} of {total} sheet(s) written...")
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def finish(self):
+        self.job = None
+        self.generate_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        self.status.config(text="")
 
 def open_attendance_sheet_window():
+    # The Toplevel runs on the main window's event loop
     win = tk.Toplevel()
     AttendanceSheetApp(win)
-    win.mainloop()
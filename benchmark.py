@@ -0,0 +1,265 @@
+"""
+Benchmarks for the document rendering and roster data paths (no tkinter needed).
+
+Usage:
+    python -m benchmark --sizes 1000 10000 100000 --out benchmark.json
+    python -m benchmark --sizes 1000 --docs 50
+
+Each result records the operation count, total seconds, throughput (ops/sec),
+p50/p95 latency in milliseconds and the process peak RSS so far. Document
+benchmarks render at most --docs documents per roster size; the data benchmarks
+use the whole roster.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import render
+from certificate import create_certificate_template
+from roster import Roster
+from roster_index import RosterIndex
+from student_store import ROSTER_COLUMNS, StudentStore
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_DOCS = 200  # Documents rendered per benchmark and roster size
+SUBMIT_COUNT = 200  # Students appended by the submit benchmark
+SEED = 1234  # Synthetic rosters are the same on every run
+
+SUBJECTS = ['Fine Arts', 'Dance', 'Hand Craft', 'Beautician', 'Recitations', 'Song', 'Musical Instruments']
+YEARS = ['Pr-1', 'Pr-2', 'Pr', '1st', '2nd', '3rd', '4th', '5th', '6th', '7th']
+EXAM_DATA = {
+    "Date": "23.06.2024",
+    "Time (1st Part)": "8:00 AM to 9:30 AM",
+    "Time (2nd Part)": "X",
+    "Place": "Ghatal",
+}
+
+
+def synthetic_roster(size, seed=SEED):
+    """Return size random students as lists of strings in ROSTER_COLUMNS order."""
+    rng = random.Random(seed)
+
+    def word(length):
+        return rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=length - 1))
+
+    rows = []
+    for i in range(size):
+        rows.append([
+            str(i + 1),
+            f"{word(rng.randint(4, 8))} {word(rng.randint(4, 9))}",
+            f"{word(rng.randint(4, 8))} {word(rng.randint(4, 9))}",
+            word(rng.randint(6, 12)),
+            rng.choice(SUBJECTS),
+            rng.choice(YEARS),
+            f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(1990, 2015)}",
+            rng.choice(['Male', 'Female']),
+            str(rng.randint(6000000000, 9999999999)),
+        ])
+    return rows
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def summarize(name, size, latencies, seconds=None):
+    """
+    Build one result entry from per-operation latencies (seconds).
+    :param seconds: Wall time of the whole run (default: sum of latencies)
+    """
+    latencies = sorted(latencies)
+    seconds = sum(latencies) if seconds is None else seconds
+    p50, p95 = percentile(latencies, 0.50), percentile(latencies, 0.95)
+    return {
+        "name": name,
+        "size": size,
+        "count": len(latencies),
+        "seconds": round(seconds, 4),
+        "ops_per_sec": round(len(latencies) / seconds, 2) if seconds else None,
+        "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+        "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def timed_calls(func, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def timed_pages(render_sheets, df, col_map, out_dir):
+    """Time a sheet loop per page through its progress callback."""
+    latencies = []
+    last = [time.perf_counter(), 0]
+
+    def progress(done, total):
+        # Pages finish a chunk at a time in the pool; spread the wait over the chunk
+        if done > last[1]:
+            now = time.perf_counter()
+            latencies.extend([(now - last[0]) / (done - last[1])] * (done - last[1]))
+            last[:] = [now, done]
+
+    start = time.perf_counter()
+    render_sheets(df, col_map, out_dir, progress=progress, force=True)
+    return latencies, time.perf_counter() - start
+
+
+def bench_documents(size, rows, docs, work_dir):
+    """Admit cards, certificates, attendance and result sheets."""
+    sample = rows[:docs]
+    results = []
+
+    admit_dir = os.path.join(work_dir, "admit")
+    admit_records = [
+        {"Roll No.": row[0], "Name": row[1], "Examination for": "Annual", "Year": row[5],
+         "Subject": row[4], "Name of the Centre with Address": row[3]}
+        for row in sample
+    ]
+    render.render_admit_card(admit_records[0], EXAM_DATA, admit_dir)  # Warm the layout, template and fonts
+    latencies = timed_calls(lambda record: render.render_admit_card(record, EXAM_DATA, admit_dir), admit_records)
+    results.append(summarize("admit_card", size, latencies))
+
+    cert_dir = os.path.join(work_dir, "certificates")
+    os.makedirs(cert_dir, exist_ok=True)
+    students = [{"Name": row[1], "Subject": row[4], "Year": row[5]} for row in sample]
+    latencies = timed_calls(
+        lambda student: create_certificate_template(os.path.join(cert_dir, f"{student['Name']}.pdf"), student),
+        students)
+    results.append(summarize("certificate", size, latencies))
+
+    # Sheets are grouped by Subject and Year; one group keeps every page full, as in earlier releases
+    df = pd.DataFrame(rows, columns=ROSTER_COLUMNS).assign(Subject=SUBJECTS[0], Year=YEARS[3])
+    sheet_rows = render.load_plan(render.ATTENDANCE_LAYOUT).rows_per_page * docs
+    latencies, seconds = timed_pages(render.render_attendance_sheets, df.head(sheet_rows),
+                                     render.map_attendance_columns(ROSTER_COLUMNS),
+                                     os.path.join(work_dir, "attendance"))
+    results.append(summarize("attendance_page", size, latencies, seconds))
+    sheet_rows = render.load_plan(render.RESULT_LAYOUT).rows_per_page * docs
+    latencies, seconds = timed_pages(render.render_result_sheets, df.head(sheet_rows),
+                                     render.map_result_columns(ROSTER_COLUMNS),
+                                     os.path.join(work_dir, "results"))
+    results.append(summarize("result_page", size, latencies, seconds))
+    return results
+
+
+def bench_data(size, rows, work_dir, repeat):
+    """Roster load, filtering, sorting and append latency, as in StudentApp."""
+    results = []
+    store = StudentStore(os.path.join(work_dir, f"bench_{size}.db"), ROSTER_COLUMNS)
+    store.add_many(dict(zip(ROSTER_COLUMNS, row)) for row in rows)
+
+    # load_data: read every row and build the filter index
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        roster = Roster(ROSTER_COLUMNS, store.iter_rows())
+        index = RosterIndex(roster)
+        latencies.append(time.perf_counter() - start)
+    results.append(summarize("load_data", size, latencies))
+
+    # update_treeview filtering: typical filter dialog queries
+    rng = random.Random(SEED)
+    queries = []
+    for _ in range(50):
+        row = roster.row(rng.randrange(len(roster)))
+        queries.extend([
+            {"Name": row[1][:3]},
+            {"Subject": row[4], "Year": row[5]},
+            {"Address": row[3][1:5], "Sex": row[7]},
+            {"Roll No.": row[0]},
+        ])
+    latencies = timed_calls(lambda filters: index.match(filters), queries)
+    results.append(summarize("filter", size, latencies))
+
+    # update_treeview sorting: first sort per column builds its order, later sorts reuse it
+    all_ids = list(range(len(roster)))
+    latencies = timed_calls(lambda col: index.sort(all_ids, col), ROSTER_COLUMNS)
+    results.append(summarize("sort_first", size, latencies))
+    latencies = timed_calls(lambda col: index.sort(all_ids, col, reverse=True), ROSTER_COLUMNS * repeat)
+    results.append(summarize("sort_cached", size, latencies))
+
+    # submit_data: one store append and one index update per student
+    new_rows = synthetic_roster(SUBMIT_COUNT, seed=SEED + size)
+
+    def submit(row):
+        index.add(roster.row(roster.append(store.add(dict(zip(ROSTER_COLUMNS, row))))))
+
+    latencies = timed_calls(submit, new_rows)
+    results.append(summarize("submit", size, latencies))
+    store.close()
+    return results
+
+
+def run(sizes, docs, repeat, work_dir):
+    results = []
+    for size in sizes:
+        rows = synthetic_roster(size)
+        size_dir = os.path.join(work_dir, str(size))
+        os.makedirs(size_dir, exist_ok=True)
+        for result in bench_documents(size, rows, min(docs, size), size_dir) + bench_data(size, rows, size_dir, repeat):
+            print(f"{size:>7} {result['name']:<16} {result['ops_per_sec']:>10} ops/s "
+                  f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms", file=sys.stderr)
+            results.append(result)
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark", description="Time the rendering and roster data paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Synthetic roster sizes")
+    parser.add_argument("--docs", type=int, default=DEFAULT_DOCS, help="Documents rendered per benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions of the roster load and cached sorts")
+    parser.add_argument("--out", default="benchmark.json", help="JSON results file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as work_dir:
+        results = run(args.sizes, args.docs, args.repeat, work_dir)
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": args.sizes,
+            "docs": args.docs,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
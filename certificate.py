@@ -1,25 +1,40 @@
 import os
-import pandas as pd
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 
-def create_certificate_template(filename, student_data):
+from fonts import pdf_string_width
+from instrument import add_bytes, stage
+from ingest import iter_chunks, iter_records
+from manifest import Manifest, content_digest, file_digest
+from validation import ValidationError, ValidationReport
+from render import combined_pdf_path, group_key
+
+# Name of the form XObject holding everything that is the same on every certificate
+CERTIFICATE_FORM = "certificate_static"
+PAGE_SIZE = landscape(A4)
+
+# Colors parsed once instead of on every certificate
+GOLD = colors.HexColor("#d4af37")
+CREAM = colors.HexColor("#f5f2e8")
+NAVY = colors.HexColor("#2c3e50")
+GREY = colors.HexColor("#555555")
+DARK_GREY = colors.HexColor("#444444")
+CHARCOAL = colors.HexColor("#333333")
+BLACK = colors.HexColor("#000000")
+SEAL_RED = colors.HexColor("#b71c1c")
+
+def draw_certificate_static(c, width, height):
     """
-    Creates a professional PDF certificate for a student using built-in fonts.
-    :param filename: Output PDF file path
-    :param student_data: Dictionary with student info (Name, Subject, Year)
+    Draw the invariant artwork: background, borders, corners, title, seal and signature lines.
     """
-    c = canvas.Canvas(filename, pagesize=landscape(A4))
-    width, height = landscape(A4)
-
     # Background - cream/beige color like the reference
-    c.setFillColor(colors.HexColor("#f5f2e8"))
+    c.setFillColor(CREAM)
     c.rect(0, 0, width, height, fill=1, stroke=0)
 
     # Ornate double border like the reference
-    c.setStrokeColor(colors.HexColor("#d4af37"))  # Gold color
+    c.setStrokeColor(GOLD)  # Gold color
     c.setLineWidth(8)
     c.rect(0.8*cm, 0.8*cm, width-1.6*cm, height-1.6*cm, stroke=1, fill=0)
     
@@ -28,7 +43,7 @@ def create_certificate_template(filename, student_data):
 
     # Decorative corners (using built-in symbols)
     c.setFont("Times-Roman", 20)
-    c.setFillColor(colors.HexColor("#d4af37"))
+    c.setFillColor(GOLD)
     # Top corners
     c.drawString(2*cm, height-2.5*cm, "❋")
     c.drawRightString(width-2*cm, height-2.5*cm, "❋")
@@ -38,38 +53,21 @@ def create_certificate_template(filename, student_data):
 
     # Title "Certificate of Completion" - using Times-Italic for script-like look
     c.setFont("Times-Italic", 36)
-    c.setFillColor(colors.HexColor("#2c3e50"))
+    c.setFillColor(NAVY)
     c.drawCentredString(width/2, height-4.5*cm, "Certificate of Completion")
 
     # Decorative line under title
-    c.setStrokeColor(colors.HexColor("#d4af37"))
+    c.setStrokeColor(GOLD)
     c.setLineWidth(1)
     c.line(width/2-8*cm, height-5*cm, width/2+8*cm, height-5*cm)
 
     # "PRESENTED TO" in small caps
     c.setFont("Helvetica", 14)
-    c.setFillColor(colors.HexColor("#555555"))
+    c.setFillColor(GREY)
     c.drawCentredString(width/2, height-6.5*cm, "PRESENTED TO")
 
-    # Student Name - large and elegant
-    c.setFont("Times-Italic", 32)
-    c.setFillColor(colors.HexColor("#000000"))
-    c.drawCentredString(width/2, height-8.5*cm, student_data['Name'])
-    
-    # Underline for name
-    c.setStrokeColor(colors.HexColor("#333333"))
-    c.setLineWidth(1)
-    name_width = c.stringWidth(student_data['Name'], "Times-Italic", 32)
-    c.line(width/2 - name_width/2, height-9*cm, width/2 + name_width/2, height-9*cm)
-
-    # Description text
-    c.setFont("Times-Roman", 16)
-    c.setFillColor(colors.HexColor("#444444"))
-    desc = f"for successfully completing the course in {student_data['Subject']} for the year {student_data['Year']}"
-    c.drawCentredString(width/2, height-11*cm, desc)
-
     # Red wax seal (circle)
-    c.setFillColor(colors.HexColor("#b71c1c"))
+    c.setFillColor(SEAL_RED)
     c.circle(width/2, height-13*cm, 1.5*cm, fill=1, stroke=0)
     
     # Seal text
@@ -79,12 +77,12 @@ def create_certificate_template(filename, student_data):
 
     # Date and Signature sections
     c.setFont("Times-Roman", 12)
-    c.setFillColor(colors.HexColor("#333333"))
+    c.setFillColor(CHARCOAL)
     
     # Date section
     c.drawString(4*cm, 3*cm, "DATE")
     c.setLineWidth(1)
-    c.setStrokeColor(colors.HexColor("#333333"))
+    c.setStrokeColor(CHARCOAL)
     c.line(4*cm, 2.5*cm, 10*cm, 2.5*cm)
     
     # Signature section  
@@ -93,32 +91,138 @@ def create_certificate_template(filename, student_data):
 
     # Additional decorative elements
     c.setFont("Times-Roman", 16)
-    c.setFillColor(colors.HexColor("#d4af37"))
+    c.setFillColor(GOLD)
     c.drawCentredString(width/2, height-1.5*cm, "◆ ◆ ◆")
 
-    c.save()
+def draw_certificate_page(c, student_data):
+    """
+    Draw one certificate on the current page of an open canvas.
+    The static artwork is recorded once per canvas as a form XObject and then
+    only referenced, so each certificate pays just for its name and description.
+    :param c: reportlab Canvas
+    :param student_data: Dictionary with student info (Name, Subject, Year)
+    """
+    width, height = PAGE_SIZE
+    if not c.hasForm(CERTIFICATE_FORM):
+        c.beginForm(CERTIFICATE_FORM)
+        draw_certificate_static(c, width, height)
+        c.endForm()
+    c.doForm(CERTIFICATE_FORM)
 
-def generate_certificates_from_excel(excel_file, output_dir='CERTIFICATES'):
+    # Student Name - large and elegant
+    c.setFont("Times-Italic", 32)
+    c.setFillColor(BLACK)
+    c.drawCentredString(width/2, height-8.5*cm, student_data['Name'])
+    
+    # Underline for name
+    c.setStrokeColor(CHARCOAL)
+    c.setLineWidth(1)
+    name_width = pdf_string_width(student_data['Name'], "Times-Italic", 32)
+    c.line(width/2 - name_width/2, height-9*cm, width/2 + name_width/2, height-9*cm)
+
+    # Description text
+    c.setFont("Times-Roman", 16)
+    c.setFillColor(DARK_GREY)
+    desc = f"for successfully completing the course in {student_data['Subject']} for the year {student_data['Year']}"
+    c.drawCentredString(width/2, height-11*cm, desc)
+
+def create_certificate_template(filename, student_data):
+    """
+    Creates a professional PDF certificate for a student using built-in fonts.
+    :param filename: Output PDF file path
+    :param student_data: Dictionary with student info (Name, Subject, Year)
+    """
+    c = canvas.Canvas(filename, pagesize=PAGE_SIZE)
+    with stage("pdf_draw"):
+        draw_certificate_page(c, student_data)
+    with stage("pdf_save"):
+        c.save()
+    add_bytes("pdf_save", filename)
+
+def generate_certificates_from_excel(excel_file, output_dir='CERTIFICATES', combine=None):
     """
     Generate certificates for all students in the Excel file.
-    :param excel_file: Path to the Excel file with student data
+    :param excel_file: Path to the Excel/CSV file with student data (read in chunks)
     :param output_dir: Directory to save certificates (created if not exists)
+    :param combine: None for one PDF per student, "batch" or "group" for combined PDFs
+    :return: (list of generated PDF file paths, ValidationReport of the students that failed)
     """
     # Read student data
-    df = pd.read_excel(excel_file)
-    
+    return generate_certificates(iter_chunks(excel_file), output_dir, combine)
+
+def generate_certificates(data, output_dir='CERTIFICATES', combine=None, progress=None, force=False):
+    """
+    Generate certificates for all students in a DataFrame or a stream of DataFrame chunks.
+    :param data: DataFrame, or iterable of DataFrames, with Name, Subject and Year columns
+    :param output_dir: Directory to save certificates (created if not exists)
+    :param combine: None for one PDF per student, "batch" for a single PDF,
+                    "group" for one PDF per Subject/Year
+    :param progress: Optional callback(students done, None)
+    :param force: Re-create every separate PDF, even those unchanged since the last run
+    :return: (list of generated PDF file paths, ValidationReport of the students that failed)
+    """
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
     
-    # Generate certificate for each student
-    for _, row in df.iterrows():
-        student_data = {
+    students = (
+        {
             'Name': str(row['Name']),
             'Subject': str(row['Subject']),
             'Year': str(row['Year'])
         }
-        filename = os.path.join(output_dir, f"{student_data['Name'].replace(' ', '_')}_certificate.pdf")
-        try:
-            create_certificate_template(filename, student_data)
-        except Exception as e:
-            print(f"Error generating certificate for {student_data['Name']}: {e}")
+        for row in iter_records(data)
+    )
+    report = ValidationReport()
+    if combine:
+        return write_combined_certificates(students, output_dir, combine, progress), report
+
+    # Generate certificate for each student, skipping those unchanged since the last run.
+    # The artwork is drawn by this module, so its source stands in for a template file.
+    manifest = Manifest(output_dir, force)
+    base = file_digest(os.path.abspath(__file__))
+    paths = []
+    try:
+        for done, student_data in enumerate(students, 1):
+            filename = os.path.join(output_dir, f"{student_data['Name'].replace(' ', '_')}_certificate.pdf")
+            digest = content_digest(base, student_data.values())
+            try:
+                if not manifest.is_current(filename, digest):
+                    create_certificate_template(filename, student_data)
+                    manifest.record(filename, digest)
+                paths.append(filename)
+                report.valid += 1
+            except Exception as e:
+                # Collected for one summary instead of stopping the batch
+                report.errors.append(ValidationError(done - 1, "Name", f"{student_data['Name']}: {e}"))
+            if progress:
+                progress(done, None)
+    finally:
+        manifest.save()
+    return paths, report
+
+def write_combined_certificates(students, output_dir, combine, progress=None):
+    """
+    Write certificates as multi-page PDFs sharing one static-artwork form per file.
+    :param students: Iterable of student dictionaries (consumed as it is read)
+    :return: List of generated PDF file paths
+    """
+    canvases = {}
+    stems = {}
+    for done, student_data in enumerate(students, 1):
+        group = group_key(student_data, combine)
+        if group not in canvases:
+            path = combined_pdf_path(output_dir, "certificates", group, stems)
+            canvases[group] = path, canvas.Canvas(path, pagesize=PAGE_SIZE)
+        c = canvases[group][1]
+        with stage("pdf_draw"):
+            draw_certificate_page(c, student_data)
+            c.showPage()
+        if progress:
+            progress(done, None)
+    paths = []
+    for path, c in canvases.values():
+        with stage("pdf_save"):
+            c.save()
+        add_bytes("pdf_save", path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,143 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import os
+
+from certificate import generate_certificates
+from ingest import iter_chunks, read_header
+from jobs import JobRunner
+
+CERTIFICATES_DIR = os.path.join(os.getcwd(), "CERTIFICATES")
+MAX_ERRORS_SHOWN = 20  # Failed certificates listed in the summary message
+
+# Output choices: label -> combine mode (None = one PDF per student)
+OUTPUT_MODES = {
+    "Separate PDFs": None,
+    "One PDF": "batch",
+    "PDF per Subject & Year": "group",
+}
+
+class CertificateGeneratorPopup:
+    """
+    Popup for generating certificates from the current roster or an Excel/CSV file.
+    :param parent: Parent Tk window
+    :param roster: DataFrame used when no file is selected
+    """
+    def __init__(self, parent, roster=None):
+        self.roster = roster
+        self.root = tk.Toplevel(parent)
+        self.root.title("Certificate Generator")
+        self.root.geometry("500x220")
+        self.jobs = JobRunner(self.root)
+        self.job = None
+        self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        # Cancel a running batch first; its callbacks would otherwise touch destroyed widgets
+        self.jobs.close()
+        self.root.destroy()
+
+    def create_widgets(self):
+        frame = ttk.Frame(self.root, padding=20)
+        frame.pack(fill="both", expand=True)
+
+        ttk.Label(frame, text="Student Data Excel/CSV File (leave empty for current records):").pack(anchor="w")
+        entry_frame = ttk.Frame(frame)
+        entry_frame.pack(fill="x", pady=(5, 0))
+        self.file_entry = ttk.Entry(entry_frame, width=40)
+        self.file_entry.pack(side="left", padx=(0, 5), fill="x", expand=True)
+        browse_btn = ttk.Button(entry_frame, text="Browse", command=self.browse_file)
+        browse_btn.pack(side="left")
+
+        output_frame = ttk.Frame(frame)
+        output_frame.pack(fill="x", pady=(10, 0))
+        ttk.Label(output_frame, text="Output:").pack(side="left")
+        self.output_mode = ttk.Combobox(output_frame, values=list(OUTPUT_MODES), state="readonly")
+        self.output_mode.set("Separate PDFs")
+        self.output_mode.pack(side="left", padx=5)
+
+        frame2 = ttk.Frame(self.root, padding=(20, 0, 20, 20))
+        frame2.pack(fill="x")
+        self.generate_btn = ttk.Button(frame2, text="Generate Certificates", command=self.generate)
+        self.generate_btn.pack(side="left")
+        self.cancel_btn = ttk.Button(frame2, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
+        self.status = ttk.Label(frame2, text="")
+        self.status.pack(side="left", padx=5)
+
+    def browse_file(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Excel/CSV File",
+            filetypes=[("Excel/CSV Files", "*.xlsx *.xls *.csv")]
+        )
+        if file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, file_path)
+
+    def generate(self):
+        file_path = self.file_entry.get()
+        try:
+            if file_path:
+                # Header now, rows streamed in chunks while the certificates are written
+                columns = read_header(file_path)
+                data = iter_chunks(file_path)
+            elif self.roster is not None:
+                columns = list(self.roster.columns)
+                data = self.roster
+            else:
+                messagebox.showerror("Error", "Please select a valid Excel or CSV file.", parent=self.root)
+                return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read file: {e}", parent=self.root)
+            return
+        missing = [col for col in ('Name', 'Subject', 'Year') if col not in columns]
+        if missing:
+            messagebox.showerror("Error", f"Missing columns in file: {', '.join(missing)}", parent=self.root)
+            return
+
+
+        def done(result):
+            paths, report = result
+            self.finish()
+            self.show_errors(report)
+            if not paths:
+                if report.ok:
+                    messagebox.showwarning("Warning", "No records to generate certificates for!", parent=self.root)
+                return
+            messagebox.showinfo("Success", f"{len(paths)} certificate file(s) generated in {CERTIFICATES_DIR}",
+                                parent=self.root)
+
+        def failed(e):
+            self.finish()
+            messagebox.showerror("Error", f"Failed to generate certificates: {e}", parent=self.root)
+
+        def cancelled():
+            self.finish()
+            self.status.config(text="Cancelled")
+
+        self.generate_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.job = self.jobs.submit(generate_certificates, data, CERTIFICATES_DIR, OUTPUT_MODES[self.output_mode.get()],
+                                    on_progress=self.update_progress, on_done=done,
+                                    on_error=failed, on_cancel=cancelled)
+
+    def show_errors(self, report):
+        """Report all failed certificates in one message."""
+        if report.ok:
+            return
+        messagebox.showerror("Error",
+                             f"{len(report.errors)} certificate(s) failed:\n" + "\n".join(report.lines(MAX_ERRORS_SHOWN)),
+                             parent=self.root)
+
+    def update_progress(self, done, total):
+        self.status.config(text=f"{done} certificate(s) written...")
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def finish(self):
+        self.job = None
+        self.generate_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        self.status.config(text="")
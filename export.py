@@ -0,0 +1,202 @@
+import csv
+import io
+import os
+import re
+import zipfile
+from contextlib import closing
+from xml.sax.saxutils import escape
+
+from instrument import add_bytes, stage
+
+EXPORT_BATCH = 5000  # Rows written between progress reports (and per Parquet/Feather batch)
+CSV_BUFFER = 1 << 20  # Write buffer for CSV exports
+ARCHIVE_COMPRESSION = "zstd"  # Parquet/Feather compression codec
+
+# File dialog choices, xlsx first as the default
+EXPORT_FILETYPES = [
+    ("Excel files", "*.xlsx"),
+    ("CSV files", "*.csv"),
+    ("Parquet archive", "*.parquet"),
+    ("Feather archive", "*.feather"),
+]
+
+
+def export_format(path):
+    """Return the export format for a file name ("xlsx", "csv", "parquet" or "feather")."""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext not in _WRITERS:
+        raise ValueError(f"Unsupported export format: .{ext}")
+    return ext
+
+
+def _batches(rows, size):
+    batch = []
+    empty = True
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+            empty = False
+    # An empty export still gets one (empty) batch, so every format writes its header
+    if batch or empty:
+        yield batch
+
+
+def _write_csv(path, columns, batches):
+    # utf-8-sig so Excel opens names with non-ASCII letters correctly
+    with open(path, "w", newline="", encoding="utf-8-sig", buffering=CSV_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            yield len(batch)
+
+
+# Minimal SpreadsheetML package around one streamed sheet
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'),
+}
+XLSX_COMPRESS_LEVEL = 1  # Fast deflate; sheet XML still shrinks about tenfold
+# Characters XML 1.0 does not allow, dropped from xlsx cells
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_row(row):
+    # Inline strings keep every value as text, so no shared-strings table has to be held in memory
+    cells = "".join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_XML_ILLEGAL.sub("", str(value)))}</t></is></c>'
+        for value in row)
+    return f"<row>{cells}</row>"
+
+
+def _write_xlsx(path, columns, batches):
+    # The sheet is streamed into the zip as XML; openpyxl, even in write-only mode,
+    # builds and serializes an object per cell and takes about 15x longer
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=XLSX_COMPRESS_LEVEL) as zf:
+        for name, xml in _XLSX_PARTS.items():
+            zf.writestr(name, xml)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as raw:
+            sheet = io.TextIOWrapper(raw, encoding="utf-8", write_through=False)
+            sheet.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            sheet.write(_xlsx_row(columns))
+            for batch in batches:
+                sheet.write("".join(_xlsx_row(row) for row in batch))
+                yield len(batch)
+            sheet.write("</sheetData></worksheet>")
+            sheet.flush()
+            sheet.detach()
+
+
+def _arrow_batches(columns, batches):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Parquet and Feather export need pyarrow (pip install pyarrow)") from None
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    for batch in batches:
+        arrays = [pa.array([row[pos] for row in batch], pa.string()) for pos in range(len(columns))]
+        yield schema, pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _write_parquet(path, columns, batches):
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for schema, record_batch in _arrow_batches(columns, batches):
+            if writer is None:
+                # Dictionary encoding keeps repeated Subject/Year/Sex values small
+                writer = pq.ParquetWriter(path, schema, compression=ARCHIVE_COMPRESSION, use_dictionary=True)
+            writer.write_batch(record_batch)
+            yield record_batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_feather(path, columns, batches):
+    import pyarrow as pa
+
+    options = pa.ipc.IpcWriteOptions(compression=ARCHIVE_COMPRESSION)
+    writer = None
+    try:
+        # Feather v2 is the Arrow IPC file format, written one batch at a time
+        for schema, record_batch in _arrow_batches(columns, batches):
+            if writer is None:
+                writer = pa.ipc.new_file(path, schema, options=options)
+            writer.write_batch(record_batch)
+            yield record_batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "xlsx": _write_xlsx,
+    "parquet": _write_parquet,
+    "feather": _write_feather,
+}
+
+
+def export_rows(path, columns, rows, total=None, progress=None):
+    """
+    Stream rows to a CSV, xlsx, Parquet or Feather file, chosen by the extension.
+    Rows are written in batches as they are read, so memory does not grow with the
+    export, and every value is written as text (phone numbers keep leading zeros).
+    The file is written under a temporary name and renamed when complete, so a
+    failed or cancelled export never leaves a half-written file behind.
+    :param columns: Column names for the header
+    :param rows: Iterable of row sequences in column order, e.g. Roster.view(ids)
+    :param total: Row count for progress reporting (default: len(rows) if available)
+    :param progress: Optional callback(rows written, total) after each batch
+    :return: Number of rows written
+    """
+    writer = _WRITERS[export_format(path)]
+    if total is None and hasattr(rows, "__len__"):
+        total = len(rows)
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.partial{ext}"
+    written = 0
+    try:
+        # closing() shuts the writer's file before a cancelled export deletes it
+        with stage("export"), closing(writer(tmp, list(columns), _batches(rows, EXPORT_BATCH))) as counts:
+            for count in counts:
+                written += count
+                if progress:
+                    progress(written, total)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    add_bytes("export", path)
+    return written
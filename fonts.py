@@ -0,0 +1,65 @@
+from functools import lru_cache
+import os
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Bounded caches; Subject, Year, Date, Place etc. repeat on every document and stay hot
+GLYPH_CACHE_SIZE = 1024  # Rasterized strings kept per process
+WIDTH_CACHE_SIZE = 4096  # Measured string widths kept per process
+
+# Process-wide font registry shared by all generators
+_fonts = {}
+_pdf_fonts = {}
+
+
+def get_font(file, size):
+    """Load a TrueType face/size on first use (falls back to Pillow's default font)."""
+    key = (file, size)
+    if key not in _fonts:
+        try:
+            _fonts[key] = ImageFont.truetype(file, size)
+        except OSError:
+            _fonts[key] = ImageFont.load_default()
+    return _fonts[key]
+
+
+def get_pdf_font(file):
+    """Register a TrueType font with ReportLab once; returns its name, or None if unavailable."""
+    if file not in _pdf_fonts:
+        name = os.path.splitext(os.path.basename(file))[0]
+        try:
+            pdfmetrics.registerFont(TTFont(name, file))
+            _pdf_fonts[file] = name
+        except Exception:
+            _pdf_fonts[file] = None
+    return _pdf_fonts[file]
+
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def text_mask(font, text):
+    """
+    Rasterize a string once and return (dx, dy, mask).
+    The mask is an "L" image of the text's bounding box; dx/dy place it relative
+    to the point draw.text would have been given.
+    """
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+    return left, top, mask
+
+
+def draw_text(img, xy, text, font, fill="black"):
+    """Draw text like ImageDraw.text, reusing the cached rasterization of repeated strings."""
+    dx, dy, mask = text_mask(font, text)
+    img.paste(fill, (int(xy[0] + dx), int(xy[1] + dy)), mask)
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def pdf_string_width(text, font_name, size):
+    return pdfmetrics.stringWidth(text, font_name, size)
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def pdf_ascent(font_name, size):
+    return pdfmetrics.getAscent(font_name, size)
@@ -0,0 +1,146 @@
+"""
+Headless bulk document generation (no tkinter needed).
+
+Usage:
+    python -m generate admit --input students.xlsx --out "ADMIT CARDS" --workers 4 --place "Ghatal"
+    python -m generate attendance --input students.xlsx --out ATTENDANCE_SHEETS
+    python -m generate results --input students.xlsx --out RESULT_SHEETS
+    python -m generate certificates --input students.xlsx --out CERTIFICATES --combine group
+"""
+import argparse
+import os
+import sys
+
+import instrument
+import render
+from certificate import generate_certificates
+from ingest import iter_chunks, iter_records, read_header
+from layout import load_plan
+from output import FORMATS, OutputSettings
+from validation import iter_valid_admit_records, validate_admit_batch
+
+
+def print_progress(done, total):
+    print(f"\r{done}/{total or '?'}", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+
+def output_settings(args, layout_name):
+    """The layout's encoding settings with any command line overrides applied."""
+    default = load_plan(layout_name).output
+    return OutputSettings(
+        format=args.format or default.format,
+        quality=args.quality or default.quality,
+        optimize=args.optimize or default.optimize,
+        progressive=args.progressive or default.progressive,
+        grayscale=args.grayscale or default.grayscale,
+        preview_width=args.preview_width or default.preview_width,
+    )
+
+
+def run_admit(path, args):
+    exam_data = {
+        "Date": args.date,
+        "Time (1st Part)": args.time1,
+        "Time (2nd Part)": args.time2,
+        "Place": args.place,
+    }
+    # Validate everything, duplicate rolls included, before rendering
+    report = validate_admit_batch(iter_records(iter_chunks(path)), exam_data)
+    for line in report.lines():
+        print(line, file=sys.stderr)
+    # Read the file again to render, so only the rejected row numbers were kept in memory
+    records = iter_valid_admit_records(iter_records(iter_chunks(path)), report)
+    if args.combine:
+        paths = render.render_admit_cards_pdf(records, exam_data, args.out, args.combine, print_progress,
+                                              total=report.valid)
+    else:
+        paths = render.render_admit_cards(records, exam_data, args.out, args.workers, print_progress,
+                                          total=report.valid, force=args.force,
+                                          output=output_settings(args, render.ADMIT_LAYOUT))
+    return paths, len(report.errors)
+
+
+def run_sheets(path, args, map_columns, layout_name, render_sheets):
+    col_map = map_columns(read_header(path))
+    missing = [k for k in load_plan(layout_name).field_names if k not in col_map]
+    if missing:
+        raise ValueError(f"Missing columns in file: {', '.join(missing)}")
+    return render_sheets(iter_chunks(path), col_map, args.out, print_progress, force=args.force,
+                         output=output_settings(args, layout_name), workers=args.workers), 0
+
+
+def run_attendance(path, args):
+    return run_sheets(path, args, render.map_attendance_columns, render.ATTENDANCE_LAYOUT,
+                      render.render_attendance_sheets)
+
+
+def run_results(path, args):
+    return run_sheets(path, args, render.map_result_columns, render.RESULT_LAYOUT,
+                      render.render_result_sheets)
+
+
+def run_certificates(path, args):
+    paths, report = generate_certificates(iter_chunks(path), args.out, args.combine, force=args.force)
+    for line in report.lines():
+        print(line, file=sys.stderr)
+    return paths, len(report.errors)
+
+
+COMMANDS = {
+    "admit": (run_admit, render.ADMIT_CARDS_DIR),
+    "attendance": (run_attendance, render.ATTENDANCE_SHEETS_DIR),
+    "results": (run_results, render.RESULT_SHEETS_DIR),
+    "certificates": (run_certificates, os.path.join(os.getcwd(), "CERTIFICATES")),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="generate", description="Generate student documents in bulk.")
+    parser.add_argument("document", choices=list(COMMANDS), help="Type of document to generate")
+    parser.add_argument("--input", required=True, help="Student list (.xlsx or .csv)")
+    parser.add_argument("--out", help="Output directory (default: the folder the app uses)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--combine", choices=render.COMBINE_MODES, default=None,
+                        help="admit/certificates: write one multi-page PDF per batch or per Subject/Year group")
+    parser.add_argument("--instrument", metavar="LOG",
+                        help="Append a per-stage timing breakdown of the run to LOG")
+    parser.add_argument("--cprofile", metavar="FILE", help="With --instrument: also write a cProfile dump to FILE")
+    parser.add_argument("--force", action="store_true",
+                        help="Render every document, even those unchanged since the last run (see manifest.json)")
+    encoding = parser.add_argument_group("image output (admit cards, attendance and result sheets)")
+    encoding.add_argument("--format", choices=list(FORMATS), help="Image format (default: jpeg)")
+    encoding.add_argument("--quality", type=int, help="JPEG quality, 1-95 (default: 75)")
+    encoding.add_argument("--optimize", action="store_true", help="Smaller files at the cost of slower encoding")
+    encoding.add_argument("--progressive", action="store_true", help="Progressive JPEG")
+    encoding.add_argument("--grayscale", action="store_true", help="Draw and save in grayscale")
+    encoding.add_argument("--preview-width", type=int, metavar="PX",
+                          help="Also save a preview this wide in a previews/ sub-folder")
+    exam = parser.add_argument_group("admit card examination details")
+    exam.add_argument("--date", default="23.06.2024", help="Exam date, DD.MM.YYYY")
+    exam.add_argument("--time1", default="8:00 AM to 9:30 AM", help="Time (1st Part)")
+    exam.add_argument("--time2", default="X", help="Time (2nd Part)")
+    exam.add_argument("--place", default="", help="Exam place")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    run, default_out = COMMANDS[args.document]
+    args.out = args.out or default_out
+    if args.instrument:
+        instrument.enable(args.instrument, args.cprofile)
+    try:
+        paths, errors = instrument.run(run, args.input, args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        instrument.report(args.document)
+    print(f"{len(paths)} {args.document} document(s) generated in {args.out}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
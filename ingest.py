@@ -0,0 +1,101 @@
+import csv
+import pandas as pd
+from openpyxl import load_workbook
+
+from instrument import stage
+
+CHUNK_ROWS = 1000  # Rows per chunk handed to the generators
+
+
+def _is_csv(path):
+    return path.lower().endswith('.csv')
+
+
+def read_header(path):
+    """Return the column names of an Excel/CSV file without loading its rows."""
+    if _is_csv(path):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+    if path.lower().endswith('.xlsx'):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            header = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        return [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+    return list(pd.read_excel(path, nrows=0).columns)
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, dtype=None):
+    """
+    Yield an Excel/CSV file as DataFrames of at most chunk_rows rows.
+    xlsx is read with openpyxl in read-only mode and CSV with pandas' chunked
+    reader, so memory stays bounded and the first chunk is available at once.
+    :param dtype: Passed to pandas (e.g. str) to keep values such as phone numbers as text
+    """
+    chunks = _read_chunks(path, chunk_rows, dtype)
+    while True:
+        # Only the parsing is timed, not the caller's work between chunks
+        with stage("read_input"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _read_chunks(path, chunk_rows, dtype):
+    if _is_csv(path):
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype=dtype)
+        return
+    if not path.lower().endswith('.xlsx'):
+        # Legacy .xls has no streaming reader; read it once and slice
+        df = pd.read_excel(path, dtype=dtype)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+        width = len(columns)
+        batch = []
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            values = tuple(values[:width]) + (None,) * (width - len(values))
+            if dtype is str:
+                values = tuple(_text(value) for value in values)
+            batch.append(values)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        wb.close()
+
+
+def _text(value):
+    # Match pandas' dtype=str: whole-number floats lose their ".0", empty cells stay missing
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def as_chunks(data):
+    """Accept a single DataFrame or an iterable of DataFrames and yield DataFrames."""
+    if isinstance(data, pd.DataFrame):
+        yield data
+    else:
+        yield from data
+
+
+def iter_records(data):
+    """Yield one dictionary per row from a DataFrame or an iterable of DataFrames."""
+    for chunk in as_chunks(data):
+        yield from chunk.to_dict('records')
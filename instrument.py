@@ -0,0 +1,146 @@
+"""
+Opt-in hot-path instrumentation.
+
+Set STUDENT_INSTRUMENT to a log file path (or call enable()) to time the
+pipeline stages: Excel/CSV parsing, template decoding, text drawing, JPEG
+encoding, PDF saving, roster exports and the Treeview refresh. Each report() appends a stage
+breakdown (calls, totals, share of the run, per-call p50/p95, bytes written)
+to the log. With STUDENT_CPROFILE set, each run() also writes a cProfile dump.
+When disabled, stage() returns a shared no-op context and costs one check.
+"""
+import cProfile
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+LOG_ENV = "STUDENT_INSTRUMENT"
+PROFILE_ENV = "STUDENT_CPROFILE"
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_samples = {}  # stage -> list of durations in seconds
+_bytes = {}  # stage -> bytes written
+_log_path = os.environ.get(LOG_ENV) or None
+_profile_path = os.environ.get(PROFILE_ENV) or None
+_run_start = time.perf_counter()
+
+
+def enabled():
+    return _log_path is not None
+
+
+def enable(log_path, profile_path=None):
+    """
+    Turn instrumentation on for this process and, through the environment, for
+    worker processes started afterwards.
+    """
+    global _log_path, _profile_path, _run_start
+    _log_path = log_path
+    os.environ[LOG_ENV] = log_path
+    if profile_path:
+        _profile_path = profile_path
+        os.environ[PROFILE_ENV] = profile_path
+    _run_start = time.perf_counter()
+
+
+def run(func, *args, **kwargs):
+    """
+    Call func, under cProfile when a profile path is set; the dump of the latest
+    run replaces the previous one. cProfile only sees the calling thread, so this
+    wraps the job itself rather than the whole program.
+    """
+    if _profile_path is None:
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(_profile_path)
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """Context manager timing one call of a stage (a no-op unless enabled)."""
+    return _Stage(name) if _log_path is not None else _NULL
+
+
+def record(name, seconds):
+    with _lock:
+        _samples.setdefault(name, []).append(seconds)
+
+
+def add_bytes(name, path):
+    """Count the size of a file written by a stage."""
+    if _log_path is None:
+        return
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    with _lock:
+        _bytes[name] = _bytes.get(name, 0) + size
+
+
+def collect():
+    """Return and reset this process's samples, for sending back from a pool worker."""
+    if _log_path is None:
+        return None
+    with _lock:
+        stats = (dict(_samples), dict(_bytes))
+        _samples.clear()
+        _bytes.clear()
+    return stats
+
+
+def merge(stats):
+    """Add samples returned by collect() in another process."""
+    if not stats:
+        return
+    samples, written = stats
+    with _lock:
+        for name, durations in samples.items():
+            _samples.setdefault(name, []).extend(durations)
+        for name, size in written.items():
+            _bytes[name] = _bytes.get(name, 0) + size
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def report(title="run"):
+    """Append the stage breakdown since the last report to the log and start a new run."""
+    global _run_start
+    if _log_path is None:
+        return
+    samples, written = collect()
+    elapsed = time.perf_counter() - _run_start
+    _run_start = time.perf_counter()
+    lines = [f"== {title} at {datetime.now().isoformat(timespec='seconds')}, {elapsed:.3f} s"]
+    lines.append(f"{'stage':<18}{'calls':>8}{'total s':>10}{'share':>8}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>14}")
+    for name, durations in sorted(samples.items(), key=lambda item: sum(item[1]), reverse=True):
+        durations.sort()
+        total = sum(durations)
+        # Share of wall time; stages timed in worker processes can add up to more than 100%
+        share = total / elapsed * 100 if elapsed else 0
+        lines.append(f"{name:<18}{len(durations):>8}{total:>10.3f}{share:>7.1f}%"
+                     f"{_percentile(durations, 0.5) * 1000:>10.2f}{_percentile(durations, 0.95) * 1000:>10.2f}"
+                     f"{written.get(name, 0):>14}")
+    with open(_log_path, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n\n")
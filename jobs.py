@@ -0,0 +1,135 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import instrument
+
+POLL_MS = 100  # How often the Tk thread drains job messages while jobs are running
+MAX_JOBS = 2  # Jobs run at the same time per window; rendering itself may use a process pool
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job by its progress callback once cancel() was requested."""
+
+
+class Job:
+    """
+    Handle for a submitted job.
+    Callbacks always run on the Tk thread; progress() is called from the worker.
+    """
+
+    def __init__(self, runner, name, on_progress=None, on_done=None, on_error=None, on_cancel=None):
+        self.runner = runner
+        self.name = name
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop at its next progress report."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def progress(self, done, total=None):
+        """Progress callback handed to the render functions as progress=."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.runner.messages.put((self, "progress", (done, total)))
+
+
+class JobRunner:
+    """
+    Runs long generations and file writes on a thread pool so the Tk main loop
+    keeps running. Workers only post messages to a queue; the Tk thread drains
+    it with root.after and runs the job's callbacks.
+    :param root: Tk or Toplevel window whose after() is used for polling
+    :param workers: Number of jobs that may run at the same time
+    """
+
+    def __init__(self, root, workers=MAX_JOBS):
+        self.root = root
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.messages = queue.Queue()
+        self.active = 0
+        self.jobs = set()  # Submitted jobs that have not finished yet
+        self.closed = False
+        self._polling = False
+
+    def submit(self, func, *args, name=None, on_progress=None, on_done=None, on_error=None, on_cancel=None):
+        """
+        Run func(*args, progress=job.progress) on a worker thread.
+        func must not touch Tk; its return value is passed to on_done(result),
+        an exception to on_error(exc), and a cancellation to on_cancel().
+        :param name: Label for the job's instrumentation report (default: func's name)
+        :return: Job
+        """
+        job = Job(self, name or getattr(func, "__name__", "job"), on_progress, on_done, on_error, on_cancel)
+        self.active += 1
+        self.jobs.add(job)
+        self.pool.submit(self._run, job, func, args)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+        return job
+
+    def close(self):
+        """
+        Cancel every job and stop running callbacks, for a window being closed: running
+        jobs stop at their next progress report, queued ones never start, and nothing
+        touches the destroyed widgets afterwards.
+        """
+        self.closed = True
+        for job in self.jobs:
+            job.cancel()
+        # The worker threads wind down on their own; the window does not wait for them
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, func, args):
+        try:
+            result = instrument.run(func, *args, progress=job.progress)
+        except JobCancelled:
+            self.messages.put((job, "cancelled", None))
+        except Exception as e:
+            self.messages.put((job, "error", e))
+        else:
+            self.messages.put((job, "done", result))
+
+    def _poll(self):
+        if self.closed:
+            self._polling = False
+            return
+        latest = {}
+        finished = []
+        while True:
+            try:
+                job, kind, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # Only the newest progress per job is worth drawing
+                latest[job] = value
+            else:
+                latest.pop(job, None)
+                finished.append((job, kind, value))
+        for job, (done, total) in latest.items():
+            if job.on_progress:
+                job.on_progress(done, total)
+        for job, kind, value in finished:
+            self.active -= 1
+            self.jobs.discard(job)
+            instrument.report(f"{job.name} ({kind})")
+            if kind == "done" and job.on_done:
+                job.on_done(value)
+            elif kind == "error" and job.on_error:
+                job.on_error(value)
+            elif kind == "cancelled" and job.on_cancel:
+                job.on_cancel()
+        if self.active:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
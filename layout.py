@@ -0,0 +1,178 @@
+import json
+import os
+from PIL import Image
+from reportlab.lib import colors
+
+from fonts import get_font, get_pdf_font, draw_text, pdf_ascent
+from instrument import stage
+from manifest import content_digest, file_digest
+from output import OutputSettings
+from template_cache import map_template, new_page, template_stamp
+
+# Declarative template layouts, one JSON file per template:
+#   template       background image path
+#   fonts          {"regular": {"file": "arial.ttf", "size": 48}, ...}
+#   fields         [{"name": "Roll No.", "x": 761, "y": 303, "font": "bold", "fill": "black"}, ...]
+#   row_height     vertical offset between repeated rows (sheets only)
+#   rows_per_page  rows drawn per page (1 for single documents)
+#   output         optional encoding defaults, e.g. {"format": "png", "grayscale": true} (see output.OutputSettings)
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+PDF_DPI = 300  # Template pixels per inch when a layout is placed on a PDF page
+# Built-in PDF fonts used when a layout's TrueType file is not installed
+PDF_FALLBACK_FONTS = {"regular": "Helvetica", "bold": "Helvetica-Bold"}
+
+# Per-process caches shared by every generator and every document in a batch
+_plans = {}
+_previews = {}
+
+
+class RenderPlan:
+    """
+    A compiled layout: fonts resolved and fields flattened to draw tuples.
+    :param name: Layout name (file name in LAYOUT_DIR without .json)
+    :param spec: Parsed layout dictionary
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.template = spec["template"]
+        self.row_height = spec.get("row_height", 0)
+        self.rows_per_page = spec.get("rows_per_page", 1)
+        self.font_specs = spec.get("fonts", {})
+        self.output = OutputSettings.from_spec(spec.get("output", {}))
+        self.field_names = [field["name"] for field in spec["fields"]]
+        # (name, x, y, font key, fill) per field
+        self.fields = [
+            (field["name"], field["x"], field["y"], field.get("font", "regular"), field.get("fill", "black"))
+            for field in spec["fields"]
+        ]
+
+    def row(self, record):
+        """Return a record dictionary as a row tuple in field order, as draw_page expects."""
+        return tuple(record.get(name, "") for name in self.field_names)
+
+    def font(self, key, scale=1):
+        """Return the Pillow font for a font key, optionally scaled (e.g. for previews)."""
+        font_spec = self.font_specs.get(key) or self.font_specs["regular"]
+        return get_font(font_spec["file"], max(1, round(font_spec["size"] * scale)))
+
+    def pdf_font(self, key):
+        """Return (registered font name, size in points) for a font key."""
+        font_spec = self.font_specs.get(key) or self.font_specs["regular"]
+        name = get_pdf_font(font_spec["file"]) or PDF_FALLBACK_FONTS.get(key, "Helvetica")
+        return name, font_spec["size"] * 72 / PDF_DPI
+
+    def page_size(self):
+        """PDF page size in points, from the template size at PDF_DPI."""
+        width, height = load_template(self.template).size
+        return width * 72 / PDF_DPI, height * 72 / PDF_DPI
+
+    def digest(self):
+        """Hash of the layout file and its template image, shared by every document of a batch."""
+        layout_digest = file_digest(os.path.join(LAYOUT_DIR, f"{self.name}.json"))
+        return content_digest(layout_digest, [file_digest(self.template)])
+
+    def warm(self, mode="RGB"):
+        """Map the template (decoding it into the shared cache if needed) and load the fonts ahead of a batch."""
+        load_template(self.template, mode)
+        for key in self.font_specs:
+            self.font(key)
+
+
+def load_plan(name):
+    """Compile a layout once per process and return the cached RenderPlan."""
+    if name not in _plans:
+        with open(os.path.join(LAYOUT_DIR, f"{name}.json"), encoding="utf-8") as f:
+            _plans[name] = RenderPlan(name, json.load(f))
+    return _plans[name]
+
+
+def load_template(path, mode="RGB"):
+    """
+    Return the template mapped read-only from the shared raw cache (see template_cache).
+    Its mode may be the raw mode (RGBX for RGB); pages are drawn on template_cache.new_page().
+    """
+    return map_template(path, mode)
+
+
+def load_preview_template(path, width):
+    """Return the template downscaled to width pixels, resized once per process; draw on a copy."""
+    key = (path, width, template_stamp(path))
+    if key not in _previews:
+        # Previews of an edited template's old version are no longer needed
+        for old in [old for old in _previews if old[:2] == (path, width)]:
+            del _previews[old]
+        full = load_template(path)
+        height = max(1, round(full.height * width / full.width))
+        _previews[key] = full.resize((width, height), Image.LANCZOS, reducing_gap=2.0).convert("RGB")
+    return _previews[key]
+
+
+def draw_preview(plan, rows, width):
+    """
+    Draw a page at preview size for on-screen review; nothing is written to disk.
+    Field positions and font sizes are scaled to the downscaled template.
+    :param rows: List of string tuples in plan.field_names order
+    :return: PIL Image width pixels wide
+    """
+    img = load_preview_template(plan.template, width).copy()
+    scale = width / load_template(plan.template).width
+    fonts = {key: plan.font(key, scale) for key in {field[3] for field in plan.fields}}
+    for row_num, row in enumerate(rows):
+        y_offset = row_num * plan.row_height
+        for (name, x, y, font_key, fill), value in zip(plan.fields, row):
+            if value:
+                draw_text(img, (round(x * scale), round((y + y_offset) * scale)), value, fonts[font_key], fill)
+    return img
+
+
+def draw_page(plan, rows, mode="RGB"):
+    """
+    Draw up to plan.rows_per_page rows onto a copy of the template.
+    :param rows: List of string tuples in plan.field_names order (empty strings draw nothing)
+    :param mode: "RGB", or "L" to draw straight onto a grayscale template
+    :return: PIL Image (RGBX for "RGB", see template_cache.new_page)
+    """
+    img = new_page(plan.template, mode)
+    fonts = {key: plan.font(key) for key in {field[3] for field in plan.fields}}
+    with stage("draw_text"):
+        for row_num, row in enumerate(rows):
+            y_offset = row_num * plan.row_height
+            for (name, x, y, font_key, fill), value in zip(plan.fields, row):
+                if value:
+                    draw_text(img, (x, y + y_offset), value, fonts[font_key], fill)
+    return img
+
+
+def render_page(plan, rows, out_path, output=None):
+    """
+    Draw a page and encode it (and its preview, if enabled) in one pass.
+    :param output: OutputSettings (default: the layout's own)
+    """
+    output = output or plan.output
+    return output.save(draw_page(plan, rows, output.mode), out_path)
+
+
+def draw_pdf_page(c, plan, rows):
+    """
+    Draw one page of a layout onto a ReportLab canvas and end the page.
+    The template is drawn by file name, so ReportLab embeds it once per PDF and
+    every page references the same image; the fields are drawn as PDF text.
+    :param c: reportlab Canvas created with pagesize=plan.page_size()
+    :param rows: List of string tuples in plan.field_names order
+    """
+    width, height = plan.page_size()
+    scale = 72 / PDF_DPI
+    with stage("pdf_draw"):
+        c.drawImage(plan.template, 0, 0, width, height)
+        for row_num, row in enumerate(rows):
+            y_offset = row_num * plan.row_height
+            for (name, x, y, font_key, fill), value in zip(plan.fields, row):
+                if value:
+                    font_name, size = plan.pdf_font(font_key)
+                    c.setFont(font_name, size)
+                    c.setFillColor(colors.toColor(fill))
+                    # Pillow anchors text at its top-left, PDF at the baseline
+                    baseline = height - (y + y_offset) * scale - pdf_ascent(font_name, size)
+                    c.drawString(x * scale, baseline, value)
+        c.showPage()
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "manifest.json"  # Kept in each output directory
+SAVE_EVERY = 50  # Documents recorded between saves, so an interrupted batch can resume
+
+_file_digests = {}
+
+
+def file_digest(path):
+    """Hash a file's contents once per process (re-hashed if its size or mtime changes)."""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_digests:
+        with open(path, "rb") as f:
+            _file_digests[key] = hashlib.sha1(f.read()).hexdigest()
+    return _file_digests[key]
+
+
+def content_digest(base, values):
+    """
+    Hash of one document's inputs.
+    :param base: Digest of everything shared by the batch (layout, template)
+    :param values: The document's field values, in a fixed order
+    """
+    h = hashlib.sha1(base.encode())
+    for value in values:
+        h.update(b"\x1f")
+        h.update(str(value).encode("utf-8"))
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+    Maps each document in an output directory to the digest of the inputs it was
+    rendered from. A document whose file still exists and whose digest matches is
+    skipped on the next run.
+    :param out_dir: Output directory holding the documents and MANIFEST_FILE
+    :param force: Treat every document as changed (re-render everything)
+    """
+
+    def __init__(self, out_dir, force=False):
+        self.path = os.path.join(out_dir, MANIFEST_FILE)
+        self.force = force
+        self.entries = {}
+        self._unsaved = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            # Missing or damaged manifest: everything is rendered again
+            self.entries = {}
+
+    def is_current(self, out_path, digest):
+        name = os.path.basename(out_path)
+        return not self.force and self.entries.get(name) == digest and os.path.exists(out_path)
+
+    def record(self, out_path, digest):
+        self.entries[os.path.basename(out_path)] = digest
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    def save(self):
+        """Write the manifest atomically, so a crash never leaves it half written."""
+        if not self._unsaved and os.path.exists(self.path):
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
@@ -0,0 +1,93 @@
+import os
+
+from instrument import add_bytes, stage
+
+# Supported image formats: name -> (Pillow format, file extension)
+FORMATS = {
+    "jpeg": ("JPEG", ".jpg"),
+    "png": ("PNG", ".png"),
+}
+DEFAULT_QUALITY = 75  # Pillow's own JPEG default, so default output is unchanged
+PNG_FAST_LEVEL = 1  # zlib level for PNG unless optimize is set; much faster than the default 6
+PREVIEW_DIR = "previews"  # Sub-folder of the output directory for low-resolution previews
+PREVIEW_QUALITY = 70
+# Image modes an encoder takes as another mode without converting: JPEG reads RGBX as RGB
+ENCODER_ALIASES = {("jpeg", "RGBX"): "RGB"}
+
+
+class OutputSettings:
+    """
+    How rendered pages are encoded.
+    :param format: "jpeg" or "png"
+    :param quality: JPEG quality (1-95)
+    :param optimize: Extra encoder pass for smaller files (slower)
+    :param progressive: Progressive JPEG
+    :param grayscale: Draw and save in 8-bit grayscale, for mostly monochrome sheets
+    :param preview_width: Also save a preview about this many pixels wide (None = no preview)
+    """
+
+    def __init__(self, format="jpeg", quality=DEFAULT_QUALITY, optimize=False, progressive=False,
+                 grayscale=False, preview_width=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown output format: {format}")
+        self.format = format
+        self.quality = quality
+        self.optimize = optimize
+        self.progressive = progressive
+        self.grayscale = grayscale
+        self.preview_width = preview_width
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build settings from a layout's optional "output" block."""
+        return cls(**spec)
+
+    @property
+    def extension(self):
+        return FORMATS[self.format][1]
+
+    @property
+    def mode(self):
+        """Image mode pages are drawn in."""
+        return "L" if self.grayscale else "RGB"
+
+    def key(self):
+        """Stable description of the settings, part of each document's manifest digest."""
+        return (f"{self.format}:{self.quality}:{int(self.optimize)}:{int(self.progressive)}:"
+                f"{int(self.grayscale)}:{self.preview_width or 0}")
+
+    def save_options(self):
+        if self.format == "png":
+            return {"optimize": True} if self.optimize else {"compress_level": PNG_FAST_LEVEL}
+        return {"quality": self.quality, "optimize": self.optimize, "progressive": self.progressive}
+
+    def preview_path(self, out_path):
+        folder, name = os.path.split(out_path)
+        return os.path.join(folder, PREVIEW_DIR, os.path.splitext(name)[0] + ".jpg")
+
+    def save(self, img, out_path):
+        """
+        Encode a page, and its preview if enabled, from the image already in memory.
+        :return: out_path
+        """
+        if img.mode != self.mode and ENCODER_ALIASES.get((self.format, img.mode)) != self.mode:
+            img = img.convert(self.mode)
+        with stage("encode"):
+            img.save(out_path, FORMATS[self.format][0], **self.save_options())
+        add_bytes("encode", out_path)
+        if self.preview_width:
+            with stage("preview"):
+                save_preview(img, self.preview_path(out_path), self.preview_width)
+        return out_path
+
+
+def downscale(img, width):
+    """Shrink an image to about width pixels wide with a fast integer box reduction."""
+    factor = max(1, img.width // width)
+    return img.reduce(factor) if factor > 1 else img
+
+
+def save_preview(img, path, width):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    downscale(img, width).save(path, "JPEG", quality=PREVIEW_QUALITY)
+    return path
@@ -0,0 +1,420 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from functools import partial
+from reportlab.pdfgen import canvas
+
+import instrument
+from ingest import as_chunks
+from layout import load_plan, render_page, draw_pdf_page
+from manifest import Manifest, content_digest
+from roster_index import natural_key, year_key
+from validation import admit_card_stem
+
+ADMIT_CARDS_DIR = os.path.join(os.getcwd(), "ADMIT CARDS")
+ATTENDANCE_SHEETS_DIR = os.path.join(os.getcwd(), "ATTENDANCE_SHEETS")
+RESULT_SHEETS_DIR = os.path.join(os.getcwd(), "RESULT_SHEETS")
+
+# Layout names in layouts/ (template, field positions, fonts, rows per page)
+ADMIT_LAYOUT = "admit_card"
+ATTENDANCE_LAYOUT = "attendance_sheet"
+RESULT_LAYOUT = "result_sheet"
+ADMIT_TEMPLATE = load_plan(ADMIT_LAYOUT).template
+
+CHUNK_SIZE = 16  # Cards per pool task; keeps inter-process overhead low
+SHEET_CHUNK = 2  # Sheet pages per pool task; a page holds a whole class list
+
+# Sheets are paginated per Subject and Year, the way exam halls are run
+GROUP_FIELDS = ("Subject", "Year")
+
+# Combined PDF output: one file for the whole batch, or one per Subject/Year group
+COMBINE_MODES = ("batch", "group")
+
+
+def admit_card_path(admit_data, out_dir=ADMIT_CARDS_DIR, extension=".jpg"):
+    return os.path.join(out_dir, admit_card_stem(admit_data["Roll No."], admit_data["Name"]) + extension)
+
+
+def render_admit_card(admit_data, exam_data, out_dir=ADMIT_CARDS_DIR, output=None):
+    """
+    Draw one admit card from the admit_card layout and save it (JPEG by default).
+    :param admit_data: Dictionary with the "ADMIT DETAILS" fields
+    :param exam_data: Dictionary with the "Annual Examination" fields
+    :param output: OutputSettings (default: the layout's own)
+    :return: Output file path
+    """
+    plan = load_plan(ADMIT_LAYOUT)
+    output = output or plan.output
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = admit_card_path(admit_data, out_dir, output.extension)
+    return render_page(plan, [plan.row({**admit_data, **exam_data})], out_path, output)
+
+
+def combined_pdf_path(out_dir, prefix, group=None, stems=None):
+    """
+    Path of a combined PDF, e.g. admit_cards.pdf or admit_cards_Fine_Arts_2nd.pdf.
+    :param group: (Subject, Year) tuple from group_key, or None for the whole batch
+    :param stems: group_stems dictionary shared by the batch's PDFs; a new group is added
+        to it, so groups whose names clash get _2, _3, ... instead of overwriting a file
+    """
+    if group is None:
+        return os.path.join(out_dir, f"{prefix}.pdf")
+    stems = group_stems([group], {} if stems is None else stems)
+    return os.path.join(out_dir, f"{prefix}_{stems[group]}.pdf")
+
+
+def group_key(record, combine):
+    """Combined PDF a record belongs to: (Subject, Year) in "group" mode, else None."""
+    if combine != "group":
+        return None
+    # " Dance" and "Dance" are the same group, as on the sheets
+    return tuple(str(record[field]).strip() for field in GROUP_FIELDS)
+
+
+def render_admit_cards_pdf(records, exam_data, out_dir=ADMIT_CARDS_DIR, combine="batch", progress=None, total=None):
+    """
+    Write admit cards as multi-page PDFs instead of one JPEG per student.
+    The template image is embedded once per PDF and shared by all its pages.
+    :param records: Iterable of admit_data dictionaries (consumed as it is read)
+    :param combine: "batch" for a single PDF, "group" for one PDF per Subject/Year
+    :param total: Expected record count for progress reporting (default: len(records))
+    :return: List of output file paths
+    """
+    plan = load_plan(ADMIT_LAYOUT)
+    os.makedirs(out_dir, exist_ok=True)
+    if total is None and hasattr(records, "__len__"):
+        total = len(records)
+    done = 0
+    canvases = {}
+    stems = {}
+    for admit_data in records:
+        group = group_key(admit_data, combine)
+        if group not in canvases:
+            path = combined_pdf_path(out_dir, "admit_cards", group, stems)
+            canvases[group] = path, canvas.Canvas(path, pagesize=plan.page_size())
+        draw_pdf_page(canvases[group][1], plan, [plan.row({**admit_data, **exam_data})])
+        done += 1
+        if progress:
+            progress(done, total)
+    paths = []
+    for path, c in canvases.values():
+        with instrument.stage("pdf_save"):
+            c.save()
+        instrument.add_bytes("pdf_save", path)
+        paths.append(path)
+    return paths
+
+
+def _warm_worker(mode="RGB"):
+    load_plan(ADMIT_LAYOUT).warm(mode)
+
+
+def _render_admit_chunk(chunk, exam_data, out_dir, output):
+    # Stage timings from the worker travel back with the paths
+    paths = [render_admit_card(admit_data, exam_data, out_dir, output) for admit_data, _ in chunk]
+    return paths, instrument.collect()
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bounded_map(pool, func, batches, limit):
+    """
+    Run func(batch) on the pool with at most limit tasks in flight and yield
+    (batch, result) as tasks finish. Batches are read lazily, so a streamed input
+    starts at once, and stopping early leaves at most limit tasks to finish.
+    """
+    pending = {}
+    for batch in batches:
+        pending[pool.submit(func, batch)] = batch
+        if len(pending) >= limit:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield pending.pop(future), future.result()
+    for future in as_completed(list(pending)):
+        yield pending.pop(future), future.result()
+
+
+def render_admit_cards(records, exam_data, out_dir=ADMIT_CARDS_DIR, workers=None, progress=None, total=None,
+                       force=False, output=None):
+    """
+    Render a batch of admit cards across a process pool.
+    Cards whose inputs match the output directory's manifest are skipped, so a
+    rerun only renders new or changed students and an interrupted batch resumes.
+    The layout is compiled and its template and fonts loaded before the pool starts, so
+    forked workers share them; spawned workers load them once in the initializer.
+    Records are consumed lazily with a bounded number of chunks in flight, so a
+    streamed roster starts rendering at once and memory does not grow with its size.
+    :param records: Iterable of admit_data dictionaries
+    :param workers: Number of worker processes (default: all cores, 1 = in-process)
+    :param progress: Optional callback(done, total), called in the calling process
+    :param total: Expected record count for progress reporting (default: len(records))
+    :param force: Render every card, ignoring the manifest
+    :param output: OutputSettings (default: the layout's own)
+    :return: List of output file paths, skipped cards included
+    """
+    if total is None and hasattr(records, "__len__"):
+        total = len(records)
+    workers = workers or os.cpu_count() or 1
+    plan = load_plan(ADMIT_LAYOUT)
+    output = output or plan.output
+    _warm_worker(output.mode)
+    os.makedirs(out_dir, exist_ok=True)
+    base = content_digest(plan.digest(), [output.key()])
+    manifest = Manifest(out_dir, force)
+    paths = []
+
+    def finished(out_path, digest=None):
+        paths.append(out_path)
+        if digest:
+            manifest.record(out_path, digest)
+        if progress:
+            progress(len(paths), total)
+
+    def changed():
+        # Unchanged cards count as done without being rendered
+        for admit_data in records:
+            out_path = admit_card_path(admit_data, out_dir, output.extension)
+            digest = content_digest(base, plan.row({**admit_data, **exam_data}))
+            if manifest.is_current(out_path, digest):
+                finished(out_path)
+            else:
+                yield admit_data, digest
+
+    try:
+        if workers == 1 or (total is not None and total <= CHUNK_SIZE):
+            for admit_data, digest in changed():
+                finished(render_admit_card(admit_data, exam_data, out_dir, output), digest)
+            return paths
+
+        render_chunk = partial(_render_admit_chunk, exam_data=exam_data, out_dir=out_dir, output=output)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker, initargs=(output.mode,)) as pool:
+            batches = _batches(changed(), CHUNK_SIZE)
+            for chunk, (chunk_paths, stats) in _bounded_map(pool, render_chunk, batches, workers * 2):
+                instrument.merge(stats)
+                for out_path, (_, digest) in zip(chunk_paths, chunk):
+                    finished(out_path, digest)
+        return paths
+    finally:
+        manifest.save()
+
+
+def map_attendance_columns(columns):
+    """Map attendance fields to file columns (case-insensitive, robust to naming)."""
+    col_map = {}
+    for col in columns:
+        col_lower = col.strip().lower()
+        if "roll" in col_lower:
+            col_map["Roll No."] = col
+        elif "name" in col_lower and "guardian" not in col_lower and "father" not in col_lower:
+            col_map["Name"] = col
+        elif "subject" in col_lower:
+            col_map["Subject"] = col
+        elif "year" in col_lower:
+            col_map["Year"] = col
+    return col_map
+
+
+def map_result_columns(columns):
+    """Map result sheet fields to file columns (case-insensitive, robust to naming)."""
+    col_map = {}
+    for col in columns:
+        col_lower = col.strip().lower()
+        if "roll" in col_lower:
+            col_map["Roll No."] = col
+        elif "name" in col_lower and "guardian" not in col_lower and "father" not in col_lower:
+            col_map["Name of the Candidate"] = col
+        elif "guardian" in col_lower or "father" in col_lower:
+            col_map["Name of the Guardian"] = col
+        elif "subject" in col_lower:
+            col_map["Subject"] = col
+        elif "year" in col_lower:
+            col_map["Year"] = col
+    return col_map
+
+
+def prepare_rows(df, col_map, field_names):
+    """
+    Format the mapped columns of a DataFrame as strings in one vectorized pass.
+    Missing values become "" and everything else str(value), as drawn on the sheets.
+    :param col_map: Field to column mapping (e.g. from map_attendance_columns)
+    :param field_names: Fields to extract, in output order
+    :return: List of string tuples, one per row, in field_names order
+    """
+    columns = []
+    for field in field_names:
+        series = df[col_map[field]]
+        columns.append(series.astype(str).where(series.notna(), "").tolist())
+    return list(zip(*columns))
+
+
+def group_stems(groups, stems=None):
+    """
+    Give every Subject/Year group its own file name stem, e.g. ("Fine Arts", "2nd") -> Fine_Arts_2nd.
+    Groups that would share a stem, such as "Fine Arts" and "Fine_Arts" (or names differing
+    only in case, on Windows), get _2, _3, ... in group order, so no file overwrites another.
+    :param groups: Group tuples in output order
+    :param stems: Stems assigned so far, extended in place (for groups met while streaming)
+    :return: Dictionary of group tuple to stem
+    """
+    stems = {} if stems is None else stems
+    used = {stem.lower() for stem in stems.values()}
+    for group in groups:
+        if group in stems:
+            continue
+        stem = "_".join(part.replace(" ", "_").replace("/", "_") or "blank" for part in group)
+        unique, n = stem, 2
+        while unique.lower() in used:
+            unique, n = f"{stem}_{n}", n + 1
+        used.add(unique.lower())
+        stems[group] = unique
+    return stems
+
+
+def page_name(prefix, stem, number):
+    """
+    File name (without extension) of a sheet page: Dance_2nd_p03 for page 3 of the
+    group with stem Dance_2nd, or attendance_sheet_3 when the roster is not grouped (stem "").
+    """
+    if not stem:
+        return f"{prefix}_{number}"
+    return f"{stem}_p{number:02d}"
+
+
+def plan_sheet_pages(data, col_map, plan, group_fields=GROUP_FIELDS):
+    """
+    Group and sort the roster once and assign its rows to pages.
+    Rows are grouped by whichever of group_fields the file has (Subject, then Year
+    in course order) and sorted by Roll No. within a group; every group starts on a
+    new page. Without any group column the rows keep their file order.
+    :param data: DataFrame or iterable of DataFrame chunks
+    :return: List of (group tuple, page number in group, rows) in output order
+    """
+    group_fields = [field for field in group_fields if field in col_map]
+    fields = list(plan.field_names)
+    extract = fields + [field for field in group_fields if field not in fields]
+    rows = []
+    for chunk in as_chunks(data):
+        rows.extend(prepare_rows(chunk, col_map, extract))
+    width = len(fields)
+    if group_fields:
+        positions = [extract.index(field) for field in group_fields]
+        groups = {}
+        for row in rows:
+            # " Dance" and "Dance" are the same group
+            groups.setdefault(tuple(row[pos].strip() for pos in positions), []).append(row[:width])
+        sort_keys = [year_key if field == "Year" else str for field in group_fields]
+        order = sorted(groups, key=lambda group: [key(value.lower()) for key, value in zip(sort_keys, group)])
+        if "Roll No." in fields:
+            roll = fields.index("Roll No.")
+            for group_rows in groups.values():
+                group_rows.sort(key=lambda row: natural_key(row[roll].lower()))
+    else:
+        groups = {(): [row[:width] for row in rows]}
+        order = [()]
+    pages = []
+    size = plan.rows_per_page
+    for group in order:
+        group_rows = groups[group]
+        for number, start in enumerate(range(0, len(group_rows), size), 1):
+            pages.append((group, number, group_rows[start:start + size]))
+    return pages
+
+
+def _warm_sheet_worker(layout_name, mode):
+    load_plan(layout_name).warm(mode)
+
+
+def _render_sheet_chunk(pages, layout_name, output):
+    plan = load_plan(layout_name)
+    paths = [render_page(plan, rows, out_path, output) for out_path, rows, _ in pages]
+    return paths, instrument.collect()
+
+
+def _render_sheets(data, col_map, layout_name, out_dir, prefix, progress=None, force=False, output=None,
+                   workers=None):
+    plan = load_plan(layout_name)
+    output = output or plan.output
+    os.makedirs(out_dir, exist_ok=True)
+    base = content_digest(plan.digest(), [output.key()])
+    manifest = Manifest(out_dir, force)
+    paths = []
+    todo = []
+    pages = plan_sheet_pages(data, col_map, plan)
+    stems = group_stems(group for group, _, _ in pages)
+    for group, number, rows in pages:
+        out_path = os.path.join(out_dir, page_name(prefix, stems[group], number) + output.extension)
+        paths.append(out_path)
+        # Pages whose rows are unchanged since the last run are kept as they are
+        digest = content_digest(base, [value for row in rows for value in row])
+        if not manifest.is_current(out_path, digest):
+            todo.append((out_path, rows, digest))
+    total = len(paths)
+    done = total - len(todo)
+    if progress:
+        progress(done, total)
+    workers = workers or os.cpu_count() or 1
+    try:
+        if workers == 1 or len(todo) <= SHEET_CHUNK:
+            for out_path, rows, digest in todo:
+                # Save the sheet
+                render_page(plan, rows, out_path, output)
+                manifest.record(out_path, digest)
+                done += 1
+                if progress:
+                    progress(done, total)
+            return paths
+        # Decode the template into the shared cache once, before the workers map it
+        plan.warm(output.mode)
+        render_chunk = partial(_render_sheet_chunk, layout_name=layout_name, output=output)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_sheet_worker,
+                                 initargs=(layout_name, output.mode)) as pool:
+            for chunk, (_, stats) in _bounded_map(pool, render_chunk, _batches(todo, SHEET_CHUNK), workers * 2):
+                instrument.merge(stats)
+                for out_path, _, digest in chunk:
+                    manifest.record(out_path, digest)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+        return paths
+    finally:
+        manifest.save()
+
+
+def render_attendance_sheets(data, col_map, out_dir=ATTENDANCE_SHEETS_DIR, progress=None, force=False, output=None,
+                             workers=None):
+    """
+    Render attendance sheets from the attendance_sheet layout, one set of pages per
+    Subject/Year group when the file has those columns (see plan_sheet_pages).
+    :param data: DataFrame or iterable of DataFrame chunks (see ingest.iter_chunks)
+    :param col_map: Field to column mapping from map_attendance_columns
+    :param progress: Optional callback(pages done, total pages) as pages finish
+    :param force: Render every page, ignoring the manifest of unchanged pages
+    :param output: OutputSettings (default: the layout's own)
+    :param workers: Worker processes for the pages (default: all cores, 1 = in-process)
+    :return: List of output file paths in page order
+    """
+    return _render_sheets(data, col_map, ATTENDANCE_LAYOUT, out_dir, "attendance_sheet", progress, force, output, workers)
+
+
+def render_result_sheets(data, col_map, out_dir=RESULT_SHEETS_DIR, progress=None, force=False, output=None,
+                         workers=None):
+    """
+    Render result sheets from the result_sheet layout, one set of pages per
+    Subject/Year group when the file has those columns (see plan_sheet_pages).
+    :param data: DataFrame or iterable of DataFrame chunks (see ingest.iter_chunks)
+    :param col_map: Field to column mapping from map_result_columns
+    :param progress: Optional callback(pages done, total pages) as pages finish
+    :param force: Render every page, ignoring the manifest of unchanged pages
+    :param output: OutputSettings (default: the layout's own)
+    :param workers: Worker processes for the pages (default: all cores, 1 = in-process)
+    :return: List of output file paths in page order
+    """
+    return _render_sheets(data, col_map, RESULT_LAYOUT, out_dir, "result_sheet", progress, force, output, workers)
@@ -1,35 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
 import os
 
-# Path to the result sheet template image
-RESULT_SHEET_TEMPLATE = "result_sheet.jpg"  # Use your provided template
-
-# Coordinates for each field (adjust as needed for your template)
-# The y-coordinates are for the first row; each subsequent row is offset by ROW_HEIGHT
-FIELD_COORDS = {
-    "Roll No.": (123, 603),
-    "Name of the Candidate": (380, 590),
-    "Name of the Guardian": (920, 590),
-    "Year": (1420, 600),
-}
-ROW_HEIGHT = 108 # Vertical space between rows; adjust as per your template
-MAX_ROWS_PER_SHEET = 26  # Number of students per sheet; adjust as per your template
-
-# Font settings (adjust path/size as needed)
-try:
-    FONT = ImageFont.truetype("arial.ttf", 52)
-except:
-    FONT = ImageFont.load_default()
+from ingest import iter_chunks, read_header
+from jobs import JobRunner
+from layout import load_plan
+from render import RESULT_SHEETS_DIR, RESULT_LAYOUT, map_result_columns, render_result_sheets
 
 class ResultSheetApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Result Sheet Generator")
-        self.root.geometry("500x180")
+        self.root.geometry("500x210")
+        self.jobs = JobRunner(self.root)
+        self.job = None
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        # Cancel a running batch first; its callbacks would otherwise touch destroyed widgets
+        self.jobs.close()
+        self.root.destroy()
 
     def create_widgets(self):
         frame = ttk.Frame(self.root, padding=20)
@@ -45,7 +36,12 @@ class ResultSheetApp:
 
         frame2 = ttk.Frame(self.root, padding=20)
         frame2.pack(fill="x")
-        ttk.Button(frame2, text="Generate Result Sheets", command=self.generate_sheets).pack()
+        self.generate_btn = ttk.Button(frame2, text="Generate Result Sheets", command=self.generate_sheets)
+        self.generate_btn.pack(side="left")
+        self.cancel_btn = ttk.Button(frame2, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
+        self.status = ttk.Label(frame2, text="")
+        self.status.pack(side="left", padx=5)
 
     def browse_file(self):
         file_path = filedialog.askopenfilename(
@@ -62,55 +58,54 @@ class ResultSheetApp:
             messagebox.showerror("Error", "Please select a valid Excel file.")
             return
 
-        # Read required columns from Excel
+        # Read the header only; rows are streamed in chunks while rendering
         try:
-            df = pd.read_excel(excel_path)
+            columns = read_header(excel_path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read Excel file: {e}")
             return
 
         # Map columns (case-insensitive, robust to naming)
-        col_map = {}
-        for col in df.columns:
-            col_lower = col.strip().lower()
-            if "roll" in col_lower:
-                col_map["Roll No."] = col
-            elif "name" in col_lower and "guardian" not in col_lower and "father" not in col_lower:
-                col_map["Name of the Candidate"] = col
-            elif "guardian" in col_lower or "father" in col_lower:
-                col_map["Name of the Guardian"] = col
-            elif "year" in col_lower:
-                col_map["Year"] = col
-
-        required_fields = list(FIELD_COORDS.keys())
+        col_map = map_result_columns(columns)
+
+        required_fields = load_plan(RESULT_LAYOUT).field_names
         missing = [k for k in required_fields if k not in col_map]
         if missing:
             messagebox.showerror("Error", f"Missing columns in Excel: {', '.join(missing)}")
             return
 
-        # Output directory
-        out_dir = os.path.join(os.getcwd(), "RESULT_SHEETS")
-        os.makedirs(out_dir, exist_ok=True)
-
-        total_students = len(df)
-        sheet_count = 0
-        for start_idx in range(0, total_students, MAX_ROWS_PER_SHEET):
-            img = Image.open(RESULT_SHEET_TEMPLATE).convert("RGB")
-            draw = ImageDraw.Draw(img)
-            end_idx = min(start_idx + MAX_ROWS_PER_SHEET, total_students)
-            for row_num, idx in enumerate(range(start_idx, end_idx)):
-                row = df.iloc[idx]
-                y_offset = row_num * ROW_HEIGHT
-                for field, (x, y) in FIELD_COORDS.items():
-                    cell_value = row[col_map[field]]
-                    value = "" if pd.isnull(cell_value) else str(cell_value) # type: ignore
-                    draw.text((x, y + y_offset), value, font=FONT, fill="black")
-            # Save the sheet
-            sheet_count += 1
-            out_path = os.path.join(out_dir, f"result_sheet_{sheet_count}.jpg")
-            img.save(out_path, "JPEG")
-
-        messagebox.showinfo("Success", f"{sheet_count} result sheet(s) generated in {out_dir}")
+        out_dir = RESULT_SHEETS_DIR
+
+        def done(paths):
+            self.finish()
+            messagebox.showinfo("Success", f"{len(paths)} result sheet(s) generated in {out_dir}", parent=self.root)
+
+        def failed(e):
+            self.finish()
+            messagebox.showerror("Error", f"Failed to generate result sheets: {e}", parent=self.root)
+
+        def cancelled():
+            self.finish()
+            self.status.config(text="Cancelled")
+
+        self.generate_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.job = self.jobs.submit(render_result_sheets, iter_chunks(excel_path), col_map, out_dir,
+                                    on_progress=self.update_progress, on_done=done,
+                                    on_error=failed, on_cancel=cancelled)
+
+    def update_progress(self, done, total):
+        self.status.config(text=f"{done} of {total} sheet(s) written...")
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def finish(self):
+        self.job = None
+        self.generate_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        self.status.config(text="")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,296 @@
+from array import array
+from bisect import bisect_right
+
+from roster_index import CATEGORY_COLUMNS
+
+SEP = "\x1f"  # Unit separator between packed cells; cannot occur in a stored value
+BUILD_BATCH = 10000  # Rows packed per join while building, so the boxed strings never pile up
+
+
+def _clean(value):
+    return "" if value is None else str(value).replace(SEP, " ")
+
+
+class TextColumn:
+    """
+    One column of strings packed into a single str, each cell followed by SEP,
+    with the start offset of every cell in an array. A cell costs its characters
+    plus 4 bytes instead of a separate str object; cells are sliced out on access.
+    """
+
+    def __init__(self, values=()):
+        self.text = ""
+        self.offsets = array("I", [0])
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def __iter__(self):
+        return iter(self.text.split(SEP)[:-1])
+
+    def extend(self, values):
+        batch = []
+        for value in values:
+            batch.append(_clean(value))
+            if len(batch) == BUILD_BATCH:
+                self._pack(batch)
+                batch = []
+        if batch:
+            self._pack(batch)
+
+    def _pack(self, batch):
+        pos = self.offsets[-1]
+        offsets = array("I")
+        for value in batch:
+            pos += len(value) + 1
+            offsets.append(pos)
+        self.text += SEP.join(batch) + SEP
+        self.offsets.extend(offsets)
+
+    def append(self, value):
+        value = _clean(value)
+        self.text += value + SEP
+        self.offsets.append(len(self.text))
+
+    def set(self, i, value):
+        """Replace one cell; for several cells use set_many, which rebuilds the column once."""
+        self.set_many({i: value})
+
+    def set_many(self, edits):
+        """
+        Replace several cells, rebuilding the packed text and the offsets once:
+        each edit shifts every later offset, so edits applied one by one would
+        cost a pass over the column each.
+        :param edits: Dictionary of row index to new value
+        """
+        if not edits:
+            return
+        text, offsets = self.text, self.offsets
+        rows = sorted(edits)
+        pieces = []
+        shifted = offsets[:rows[0] + 1]
+        delta = 0
+        kept = 0  # Start of the text not yet copied
+        for n, i in enumerate(rows):
+            value = _clean(edits[i])
+            start, end = offsets[i], offsets[i + 1] - 1
+            pieces.append(text[kept:start])
+            pieces.append(value)
+            kept = end
+            delta += len(value) - (end - start)
+            # Offsets up to the next edited cell move by the change so far
+            stop = rows[n + 1] + 1 if n + 1 < len(rows) else len(offsets)
+            if delta:
+                shifted.extend(pos + delta for pos in offsets[i + 1:stop])
+            else:
+                shifted.extend(offsets[i + 1:stop])
+        pieces.append(text[kept:])
+        self.text = "".join(pieces)
+        self.offsets = shifted
+
+    def find(self, needle):
+        """Return the ascending row indices whose cell contains needle (one scan of the packed text)."""
+        rows = []
+        needle = needle.replace(SEP, " ")
+        pos = self.text.find(needle)
+        while pos != -1:
+            row = bisect_right(self.offsets, pos) - 1
+            rows.append(row)
+            # Continue after this cell so a row is listed once
+            pos = self.text.find(needle, self.offsets[row + 1])
+        return rows
+
+    def lower(self):
+        """Lower-cased copy, reusing the offsets unless lowering changed a cell's length."""
+        lowered = self.text.lower()
+        if len(lowered) != len(self.text):
+            return TextColumn(value.lower() for value in self)
+        column = TextColumn()
+        column.text = lowered
+        column.offsets = array("I", self.offsets)
+        return column
+
+
+class CategoryColumn:
+    """
+    A column with few distinct values (Subject, Year, Sex): each distinct string
+    is stored once and rows hold its code in an array.
+    """
+
+    def __init__(self, values=()):
+        self.values = []  # code -> value
+        self._codes = {}  # value -> code
+        self.codes = array("H")
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def code(self, value):
+        value = _clean(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            if code > 0xFFFF and self.codes.typecode == "H":
+                self.codes = array("I", self.codes)
+        return code
+
+    def extend(self, values):
+        for value in values:
+            self.codes.append(self.code(value))
+
+    def append(self, value):
+        self.codes.append(self.code(value))
+
+    def set(self, i, value):
+        self.codes[i] = self.code(value)
+
+    def set_many(self, edits):
+        for i, value in edits.items():
+            self.set(i, value)
+
+
+class Roster:
+    """
+    Columnar in-memory roster: the single copy of the student rows behind the
+    main window's view, filters, sorting and export.
+    Categorical columns (roster_index.CATEGORY_COLUMNS) are stored as codes, the
+    others as packed text columns.
+    :param columns: Ordered list of student columns
+    :param rows: Initial rows (sequences of column values), read once
+    """
+
+    def __init__(self, columns, rows=()):
+        self.columns = list(columns)
+        self.data = {col: CategoryColumn() if col in CATEGORY_COLUMNS else TextColumn() for col in self.columns}
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self.data[self.columns[0]])
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def column(self, col):
+        return self.data[col]
+
+    def cell(self, i, col):
+        return self.data[col][i]
+
+    def row(self, i):
+        """Return one student as a tuple in column order."""
+        return tuple(self.data[col][i] for col in self.columns)
+
+    def extend(self, rows):
+        """Append rows in batches, column by column."""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BUILD_BATCH:
+                self._extend(batch)
+                batch = []
+        if batch:
+            self._extend(batch)
+
+    def _extend(self, batch):
+        for pos, col in enumerate(self.columns):
+            self.data[col].extend(row[pos] for row in batch)
+
+    def append(self, row):
+        """Append one row and return its index."""
+        for col, value in zip(self.columns, row):
+            self.data[col].append(value)
+        return len(self) - 1
+
+    def update(self, i, row):
+        """Replace row i with new values, touching only the cells that changed."""
+        self.update_many([(i, row)])
+
+    def update_many(self, changes):
+        """
+        Replace several rows, touching only the cells that changed; each column
+        is rebuilt once for all its edits (see TextColumn.set_many).
+        :param changes: [(row index, new row)]
+        """
+        for pos, col in enumerate(self.columns):
+            column = self.data[col]
+            edits = {i: row[pos] for i, row in changes if column[i] != _clean(row[pos])}
+            column.set_many(edits)
+
+    def view(self, ids):
+        """Rows in the given order as a lazy sequence, e.g. for VirtualTreeview.set_rows."""
+        return RosterView(self, ids)
+
+    def to_frame(self, ids=None):
+        """
+        Return the rows (all, or ids in order) as a pandas DataFrame of strings,
+        built column by column straight from the roster.
+        """
+        import pandas as pd
+
+        ids = range(len(self)) if ids is None else ids
+        frame = {}
+        for col in self.columns:
+            column = self.data[col]
+            if isinstance(column, CategoryColumn):
+                codes = [column.codes[i] for i in ids]
+                frame[col] = pd.Categorical.from_codes(codes, column.values).astype(object)
+            else:
+                frame[col] = [column[i] for i in ids]
+        return pd.DataFrame(frame, columns=self.columns)
+
+
+def diff_by_roll(roster, rolls, rows, roll_col='Roll No.'):
+    """
+    Compare rows read from a file with the roster, keyed by Roll No.
+    Rows without a roll, and repeats of a roll earlier in the file, are ignored;
+    students missing from the file are left alone.
+    :param rolls: validation.RollIndex of the roster's rolls
+    :param rows: Iterable of rows in roster column order
+    :return: (added rows, [(roster row index, new row)] for changed students)
+    """
+    pos = roster.columns.index(roll_col)
+    added = []
+    changed = []
+    seen = set()
+    for row in rows:
+        roll = row[pos].strip()
+        if not roll or roll in seen:
+            continue
+        seen.add(roll)
+        row = tuple(_clean(value) for value in row)
+        i = rolls.duplicate_roll(roll)
+        if i is None:
+            added.append(row)
+        elif roster.row(i) != row:
+            changed.append((i, row))
+    return added, changed
+
+
+class RosterView:
+    """Read-only sequence of roster rows selected and ordered by row indices."""
+
+    def __init__(self, roster, ids):
+        self.roster = roster
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return self.roster.row(self.ids[i])
+
+    def __iter__(self):
+        return (self.roster.row(i) for i in self.ids)
@@ -0,0 +1,217 @@
+import re
+from bisect import insort
+from datetime import datetime
+
+# Categorical columns get a bitmap per value; the others are searched in their packed lower-cased text
+CATEGORY_COLUMNS = ('Subject', 'Year', 'Sex')
+
+# Year ladder in course order, used to rank the Year column when sorting
+YEAR_ORDER = ['Pr-1', 'Pr-2', 'Pr', '1st', '2nd', '3rd', '4th', '5th', '6th', '7th']
+_YEAR_RANK = {year.lower(): rank for rank, year in enumerate(YEAR_ORDER)}
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_key(text):
+    # "10" sorts after "9", and "A/10" after "A/9"
+    parts = _DIGITS.split(text)
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+
+def date_key(text):
+    try:
+        return (0, datetime.strptime(text.strip(), "%d-%m-%Y"))
+    except ValueError:
+        return (1, text)
+
+
+def year_key(text):
+    rank = _YEAR_RANK.get(text.strip())
+    return (0, rank, '') if rank is not None else (1, 0, text)
+
+
+# Typed sort key per column (applied to the lower-cased cell); other columns sort as text
+SORT_KEYS = {
+    'Roll No.': natural_key,
+    'Date of Birth': date_key,
+    'Year': year_key,
+    'Phone Number': natural_key,
+}
+
+
+def _bitmap(ids, size):
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _bit_positions(mask):
+    # bin() is reversed so that string position == row index
+    bits = bin(mask)[:1:-1]
+    positions = []
+    pos = bits.find('1')
+    while pos != -1:
+        positions.append(pos)
+        pos = bits.find('1', pos + 1)
+    return positions
+
+
+class RosterIndex:
+    """
+    In-memory filter index over a roster.Roster.
+    Matching keeps the Treeview semantics: a row matches when every non-empty
+    filter is a case-insensitive substring of the corresponding cell.
+    :param roster: Roster to index; rows appended to it later are passed to add()
+    """
+
+    def __init__(self, roster):
+        self.roster = roster
+        self.columns = list(roster.columns)
+        self.size = len(roster)
+        # Lower-cased copy of each text column, packed like the roster itself
+        self.lowered = {}
+        self.bitmaps = {}
+        for col in self.columns:
+            column = roster.column(col)
+            if col in CATEGORY_COLUMNS:
+                self.bitmaps[col] = self._category_bitmaps(column)
+            else:
+                self.lowered[col] = column.lower()
+        self.sort_keys = {}
+        self.orders = {}
+
+    def _category_bitmaps(self, column):
+        # Bitmaps are assembled once per value instead of OR-ed per row
+        ids_by_code = [[] for _ in column.values]
+        for i, code in enumerate(column.codes):
+            ids_by_code[code].append(i)
+        bitmaps = {}
+        for value, ids in zip(column.values, ids_by_code):
+            text = value.lower()
+            bitmaps[text] = bitmaps.get(text, 0) | _bitmap(ids, self.size)
+        return bitmaps
+
+    def add(self, row):
+        """Index one row just appended to the roster."""
+        self.add_many([row])
+
+    def add_many(self, rows):
+        """Index rows just appended to the roster, extending each lower-cased column once."""
+        first = self.size
+        rows = [[str(value).lower() for value in row] for row in rows]
+        for pos, col in enumerate(self.columns):
+            if col in self.bitmaps:
+                bitmaps = self.bitmaps[col]
+                for i, row in enumerate(rows, first):
+                    bitmaps[row[pos]] = bitmaps.get(row[pos], 0) | (1 << i)
+            else:
+                self.lowered[col].extend(row[pos] for row in rows)
+        self.size += len(rows)
+        for col, keys in self.sort_keys.items():
+            pos = self.columns.index(col)
+            key_func = SORT_KEYS.get(col)
+            for i, row in enumerate(rows, first):
+                keys.append(key_func(row[pos]) if key_func else row[pos])
+                insort(self.orders[col], i, key=keys.__getitem__)
+
+    def update(self, i, old_row, new_row):
+        """Re-index row i after Roster.update; sort orders of the changed columns are rebuilt on next use."""
+        self.update_many([(i, old_row, new_row)])
+
+    def update_many(self, changes):
+        """
+        Re-index rows after Roster.update_many, rebuilding each changed lower-cased
+        column once; sort orders of the changed columns are rebuilt on next use.
+        :param changes: [(row index, old row, new row)]
+        """
+        for pos, col in enumerate(self.columns):
+            edits = {}
+            for i, old_row, new_row in changes:
+                old_text, text = str(old_row[pos]).lower(), str(new_row[pos]).lower()
+                if old_text == text:
+                    continue
+                if col in self.bitmaps:
+                    bitmaps = self.bitmaps[col]
+                    bitmaps[old_text] &= ~(1 << i)
+                    if not bitmaps[old_text]:
+                        del bitmaps[old_text]
+                    bitmaps[text] = bitmaps.get(text, 0) | (1 << i)
+                edits[i] = text
+            if not edits:
+                continue
+            if col in self.lowered:
+                self.lowered[col].set_many(edits)
+            self.sort_keys.pop(col, None)
+            self.orders.pop(col, None)
+
+    def sort_order(self, col):
+        """
+        Return the cached ascending permutation of all rows for a column.
+        Sort keys are computed on first use and kept up to date by add().
+        """
+        if col not in self.orders:
+            key_func = SORT_KEYS.get(col) or (lambda text: text)
+            if col in self.bitmaps:
+                # One key per distinct value, looked up by code
+                column = self.roster.column(col)
+                code_keys = [key_func(value.lower()) for value in column.values]
+                keys = [code_keys[code] for code in column.codes]
+            else:
+                keys = [key_func(text) for text in self.lowered[col]]
+            self.sort_keys[col] = keys
+            self.orders[col] = sorted(range(self.size), key=keys.__getitem__)
+        return self.orders[col]
+
+    def sort(self, rows, col, reverse=False):
+        """
+        Order matched row indices by a column using the cached permutation.
+        :param rows: Row indices as returned by match()
+        """
+        order = self.sort_order(col)
+        if reverse:
+            order = self._descending(order, self.sort_keys[col])
+        if len(rows) == self.size:
+            return list(order)
+        member = bytearray(self.size)
+        for i in rows:
+            member[i] = 1
+        return [i for i in order if member[i]]
+
+    @staticmethod
+    def _descending(order, keys):
+        # Like sorted(reverse=True): tied rows stay in row order instead of being reversed too
+        result = []
+        run = []
+        for i in reversed(order):
+            if run and keys[i] != keys[run[0]]:
+                result.extend(reversed(run))
+                run = []
+            run.append(i)
+        result.extend(reversed(run))
+        return result
+
+    def match(self, filters):
+        """
+        Return the ascending row indices matching all filters.
+        :param filters: Dictionary of column name to filter string ("" = no filter)
+        """
+        full = (1 << self.size) - 1
+        mask = full
+        for col, filter_val in filters.items():
+            if not filter_val:
+                continue
+            needle = filter_val.lower()
+            if col in self.bitmaps:
+                # Few distinct values, so substring-match the values, not the rows
+                col_mask = 0
+                for text, bitmap in self.bitmaps[col].items():
+                    if needle in text:
+                        col_mask |= bitmap
+                mask &= col_mask
+            else:
+                # One str.find pass over the packed column
+                mask &= _bitmap(self.lowered[col].find(needle), self.size)
+            if not mask:
+                return []
+        return list(range(self.size)) if mask == full else _bit_positions(mask)
@@ -0,0 +1,58 @@
+import builtins
+import sys
+import time
+
+STARTUP_TIMES_FLAG = "--startup-times"  # python main.py --startup-times
+TOP_MODULES = 15  # Slowest imports listed in the report
+# Libraries that should not be imported before the window is shown
+HEAVY_MODULES = ("pandas", "numpy", "PIL", "reportlab", "openpyxl")
+
+
+class StartupTimer:
+    """
+    Startup timing report, printed to stderr.
+    Records named stages relative to process start and, like python -X importtime,
+    the cumulative time of each module's first import.
+    :param enabled: When False every method is a no-op
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.stages = []
+        self.imports = {}
+        self._import = builtins.__import__
+        if enabled:
+            builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            # Cumulative: includes the modules this one imports
+            self.imports.setdefault(name, time.perf_counter() - start)
+
+    def mark(self, stage):
+        if self.enabled:
+            self.stages.append((stage, time.perf_counter() - self.start))
+
+    def report(self):
+        """Print the stages and the slowest imports once, then stop timing imports."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        builtins.__import__ = self._import
+        out = sys.stderr
+        print("Startup stages (seconds since start):", file=out)
+        for stage, elapsed in self.stages:
+            print(f"  {elapsed:8.3f}  {stage}", file=out)
+        print("Slowest imports (cumulative seconds):", file=out)
+        slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)
+        for name, elapsed in slowest[:TOP_MODULES]:
+            print(f"  {elapsed:8.3f}  {name}", file=out)
+        heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+        if heavy:
+            print(f"Heavy modules loaded during startup: {', '.join(heavy)}", file=out)
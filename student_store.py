@@ -0,0 +1,124 @@
+import os
+import sqlite3
+
+from validation import ValidationReport, check_import_rolls, is_missing
+
+# Live student database; student_data.xlsx only seeds it and is watched for edits
+DB_FILE = 'student_data.db'
+# Roster schema, in display order
+ROSTER_COLUMNS = [
+    'Roll No.', 'Name', 'Guardian Name', 'Address', 'Subject', 'Year',
+    'Date of Birth', 'Sex', 'Phone Number'
+]
+
+
+class StudentStore:
+    """
+    SQLite record store for the student roster.
+    Adding a student is a single INSERT, so its cost does not grow with the roster.
+    :param db_path: Path to the SQLite database file (created if not exists)
+    :param columns: Ordered list of student columns, e.g. StudentApp.columns
+    """
+
+    def __init__(self, db_path, columns):
+        self.db_path = db_path
+        self.columns = list(columns)
+        # Opened on the roster loader thread and used from the Tk thread afterwards, never both at once
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL keeps each commit to a small sequential write
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        col_defs = ", ".join(f'"{col}" TEXT' for col in self.columns)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS students (id INTEGER PRIMARY KEY AUTOINCREMENT, {col_defs})")
+        self.conn.commit()
+        quoted = ", ".join(f'"{col}"' for col in self.columns)
+        self._select_sql = f"SELECT {quoted} FROM students ORDER BY id"
+        self._insert_sql = f"INSERT INTO students ({quoted}) VALUES ({', '.join('?' for _ in self.columns)})"
+        assignments = ", ".join(f'"{col}" = ?' for col in self.columns)
+        # The first student with a roll, as RollIndex and the roster see it
+        self._update_sql = (f'UPDATE students SET {assignments} '
+                            f'WHERE id = (SELECT MIN(id) FROM students WHERE "Roll No." = ?)')
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def iter_rows(self):
+        """Yield every student as a tuple of column values, in insertion order, without building a list."""
+        return self.conn.execute(self._select_sql)
+
+    def _to_row(self, record):
+        row = []
+        for col in self.columns:
+            value = record.get(col, "")
+            row.append("" if is_missing(value) else str(value))
+        return row
+
+    def add(self, record):
+        """
+        Append one student and return the stored row.
+        :param record: Dictionary keyed by column name
+        """
+        row = self._to_row(record)
+        with self.conn:
+            self.conn.execute(self._insert_sql, row)
+        return row
+
+    def add_many(self, records):
+        rows = [self._to_row(record) for record in records]
+        with self.conn:
+            self.conn.executemany(self._insert_sql, rows)
+        return rows
+
+    def update_rows(self, updates):
+        """
+        Overwrite students in place.
+        :param updates: Iterable of (stored Roll No., new row); the first student with that roll is updated
+        """
+        with self.conn:
+            self.conn.executemany(self._update_sql, [list(row) + [roll] for roll, row in updates])
+
+    def file_rows(self, path):
+        """Yield the students of an Excel/CSV file as rows in column order, converted as import_excel stores them."""
+        from ingest import iter_chunks
+
+        for df in iter_chunks(path, dtype=str):
+            for record in df.to_dict('records'):
+                yield self._to_row(record)
+
+    def import_excel(self, path, rolls=None):
+        """
+        Append the students from an Excel/CSV file.
+        Missing columns are stored as empty strings.
+        :param rolls: validation.RollIndex of the stored students; when given, rows whose
+            Roll No. is already stored or repeated in the file are skipped
+        :return: validation.ValidationReport; valid is the number of rows added, errors the skipped rows
+        """
+        from ingest import iter_chunks
+        report = ValidationReport()
+        start = 0
+        for df in iter_chunks(path, dtype=str):
+            for col in self.columns:
+                if col not in df.columns:
+                    df[col] = ""
+            records = df[self.columns].to_dict('records')
+            if rolls is None:
+                report.valid += len(records)
+            else:
+                records = check_import_rolls(records, rolls, report, start)
+            start += len(df)
+            self.add_many(records)
+        return report
+
+    def close(self):
+        self.conn.close()
+
+
+def open_store(columns, db_path=DB_FILE, seed_excel=None):
+    """
+    Open the student store, seeding it from an existing Excel roster on first use.
+    :param seed_excel: Excel file imported when the database is still empty
+    """
+    store = StudentStore(db_path, columns)
+    if seed_excel and os.path.exists(seed_excel) and store.count() == 0:
+        store.import_excel(seed_excel)
+    return store
@@ -0,0 +1,105 @@
+"""
+Decoded template images shared between processes.
+
+The first process to need a template decodes the JPEG once and writes its raw
+pixels to CACHE_DIR; every process (GUI, CLI and pool workers alike) then maps
+that file read-only, so the pixels live once in the OS page cache instead of once
+per worker, and a page starts from a single copy of the mapping rather than a
+JPEG decode. Raw files are named after the template's content hash, so an edited
+template gets a new file; set STUDENT_TEMPLATE_CACHE to move the folder.
+"""
+import mmap
+import os
+import tempfile
+
+from PIL import Image
+
+from instrument import stage
+from manifest import file_digest
+
+CACHE_ENV = "STUDENT_TEMPLATE_CACHE"
+CACHE_DIR = os.environ.get(CACHE_ENV) or os.path.join(tempfile.gettempdir(), "student_templates")
+# Pillow maps only some modes without copying; RGB is kept as RGBX, its own 4-byte in-memory layout
+RAW_MODES = {"RGB": "RGBX", "L": "L"}
+
+# Per-process mappings: (path, mode) -> (template_stamp, read-only Image over the raw file)
+_mapped = {}
+
+
+def template_stamp(path):
+    """(mtime, size) of a template file, so caches notice a template replaced while the app runs."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def raw_path(path, mode):
+    """
+    Raw cache file for a template in a mode, and the template's size (read from its header).
+    :return: (raw file path, (width, height))
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+    name = f"{file_digest(path)}_{RAW_MODES[mode]}_{width}x{height}.raw"
+    return os.path.join(CACHE_DIR, name), (width, height)
+
+
+def _write_raw(path, mode, raw):
+    with stage("template_decode"):
+        img = Image.open(path).convert(RAW_MODES[mode])
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Workers starting together may all write it; each renames a complete file into place
+    tmp = f"{raw}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(img.tobytes())
+    os.replace(tmp, raw)
+
+
+def _decode(path, mode):
+    with stage("template_decode"):
+        return Image.open(path).convert(mode)
+
+
+def map_template(path, mode="RGB"):
+    """
+    Return the template as a read-only image mapped from the raw cache, writing
+    the raw file first if no process has yet. Falls back to a private decode for
+    other modes or when the cache folder cannot be used.
+    The image's mode may be the raw mode (RGBX for RGB); draw on new_page().
+    An edited template (new mtime or size) is mapped afresh and the old mapping dropped.
+    """
+    key = (path, mode)
+    stamp = template_stamp(path)
+    cached = _mapped.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    # Drop the stale mapping before mapping the new template
+    _mapped.pop(key, None)
+    if mode not in RAW_MODES:
+        img = _decode(path, mode)
+    else:
+        raw_mode = RAW_MODES[mode]
+        try:
+            # The raw file is named by the template's content hash, so an edit gets a new file
+            raw, size = raw_path(path, mode)
+            if not os.path.exists(raw):
+                _write_raw(path, mode, raw)
+            with open(raw, "rb") as f:
+                # The mapping outlives the file object and is released with the image
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            img = Image.frombuffer(raw_mode, size, buffer, "raw", raw_mode, 0, 1)
+        except (OSError, ValueError):
+            img = _decode(path, mode)
+    _mapped[key] = (stamp, img)
+    return img
+
+
+def new_page(path, mode="RGB"):
+    """
+    Return a writable page: one plain copy out of the shared template.
+    RGB pages come back as RGBX, the same pixels in the same memory layout; JPEG
+    encodes them as they are and OutputSettings.save converts them for PNG.
+    """
+    return map_template(path, mode).copy()
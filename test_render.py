@@ -0,0 +1,27 @@
+import os
+
+from render import combined_pdf_path, group_key, group_stems
+
+
+def test_group_stems_are_unique_across_calls():
+    stems = group_stems([("Fine Arts", "2nd"), ("Dance", "")])
+    assert stems == {("Fine Arts", "2nd"): "Fine_Arts_2nd", ("Dance", ""): "Dance_blank"}
+    # Groups met later while streaming are checked against the stems already given out
+    group_stems([("Fine_Arts", "2nd"), ("fine arts", "2nd"), ("Fine Arts", "2nd")], stems)
+    assert stems[("Fine_Arts", "2nd")] == "Fine_Arts_2nd_2"
+    assert stems[("fine arts", "2nd")] == "fine_arts_2nd_3"
+    assert stems[("Fine Arts", "2nd")] == "Fine_Arts_2nd"
+
+
+def test_combined_pdf_paths_do_not_clash():
+    stems = {}
+    records = [{"Subject": "Fine Arts", "Year": "2nd"}, {"Subject": "Fine_Arts", "Year": "2nd"},
+               {"Subject": " Dance", "Year": "1st "}, {"Subject": "Dance", "Year": "1st"}]
+    groups = [group_key(record, "group") for record in records]
+    assert groups[2] == groups[3] == ("Dance", "1st")
+    paths = [combined_pdf_path("out", "admit_cards", group, stems) for group in groups]
+    assert paths == [os.path.join("out", name) for name in (
+        "admit_cards_Fine_Arts_2nd.pdf", "admit_cards_Fine_Arts_2nd_2.pdf",
+        "admit_cards_Dance_1st.pdf", "admit_cards_Dance_1st.pdf")]
+    assert group_key(records[0], "batch") is None
+    assert combined_pdf_path("out", "admit_cards") == os.path.join("out", "admit_cards.pdf")
@@ -0,0 +1,130 @@
+from roster import Roster, TextColumn, diff_by_roll
+from roster_index import SORT_KEYS, RosterIndex
+from student_store import ROSTER_COLUMNS
+from validation import RollIndex
+
+ROWS = [
+    ('A/10', 'Rina Das', 'Amal Das', 'Kolkata', 'Dance', '2nd', '01-02-2010', 'Female', '9800000010'),
+    ('A/9', 'Mitu Sen', 'Bimal Sen', 'Howrah', 'Music', 'Pr-1', '15-08-2011', 'Female', '9800000009'),
+    ('B/1', 'Raju Roy', 'Kamal Roy', 'Kolkata', 'Fine Arts', '1st', '30-12-2009', 'Male', '9800000001'),
+    ('A/2', 'Rahul Pal', 'Sunil Pal', 'Barasat', 'Dance', 'Pr', 'unknown', 'Male', '09800000002'),
+    ('C/3', 'Ëva Ghosh', 'İpsita Ghosh', 'Salt Lake', 'music', '7th', '05-05-2012', 'Female', ''),
+]
+
+
+def list_match(rows, filters):
+    columns = ROSTER_COLUMNS
+    return [i for i, row in enumerate(rows)
+            if all(value.lower() in row[columns.index(col)].lower() for col, value in filters.items() if value)]
+
+
+def list_sort(rows, ids, col, reverse=False):
+    pos = ROSTER_COLUMNS.index(col)
+    key_func = SORT_KEYS.get(col) or (lambda text: text)
+    return sorted(ids, key=lambda i: key_func(rows[i][pos].lower()), reverse=reverse)
+
+
+def check_index(roster, index):
+    rows = [roster.row(i) for i in range(len(roster))]
+    for filters in ({}, {'Name': 'r'}, {'Address': 'kol', 'Sex': 'male'}, {'Subject': 'MUSIC'},
+                    {'Name': 'ëva'}, {'Roll No.': 'a/', 'Year': 'pr'}, {'Phone Number': 'xyz'}):
+        assert index.match(filters) == list_match(rows, filters)
+        matched = index.match(filters)
+        for col in ('Roll No.', 'Name', 'Year', 'Date of Birth', 'Phone Number', 'Subject'):
+            for reverse in (False, True):
+                assert ([roster.row(i) for i in index.sort(matched, col, reverse)]
+                        == [rows[i] for i in list_sort(rows, matched, col, reverse)])
+
+
+def test_text_column_set_shifts_later_cells():
+    values = ['alpha', 'b', '', 'delta', 'echo']
+    column = TextColumn(values)
+    for i, value in [(1, 'bravo bravo'), (0, 'a'), (2, 'cc'), (4, ''), (3, 'DELTA')]:
+        column.set(i, value)
+        values[i] = value
+        assert [column[j] for j in range(len(column))] == values
+        assert list(column) == values
+    assert column.find('bravo') == [1]
+    assert column.find('a') == [0, 1]
+    column.append('last')
+    assert column[5] == 'last'
+    assert column.find('last') == [5]
+
+
+def test_text_column_set_many_matches_single_sets():
+    values = ['alpha', 'b', '', 'delta', 'echo', 'f']
+    edits = {4: 'E', 0: '', 2: 'charlie', 3: 'delta'}
+    column = TextColumn(values)
+    column.set_many(edits)
+    expected = [edits.get(i, value) for i, value in enumerate(values)]
+    assert [column[j] for j in range(len(column))] == expected
+    assert list(column) == expected
+    assert column.find('charlie') == [2]
+    assert column.find('f') == [5]
+    column.set_many({})
+    assert list(column) == expected
+
+
+def test_text_column_lower_keeps_offsets_when_length_changes():
+    column = TextColumn(['İpsita', 'ABC'])
+    lowered = column.lower()
+    assert list(lowered) == ['i̇psita', 'abc']
+    assert lowered.find('abc') == [1]
+
+
+def test_index_matches_list_filter_and_sort():
+    roster = Roster(ROSTER_COLUMNS, ROWS)
+    check_index(roster, RosterIndex(roster))
+
+
+def test_index_after_add_and_update():
+    roster = Roster(ROSTER_COLUMNS, ROWS[:3])
+    index = RosterIndex(roster)
+    # Build sort orders first, so add() and update() have cached state to maintain
+    check_index(roster, index)
+    for row in ROWS[3:]:
+        roster.append(row)
+        index.add(row)
+    check_index(roster, index)
+    old = roster.row(1)
+    new = ('A/90', 'Mitu Sengupta', 'Bimal Sen', 'Dum Dum', 'Dance', '3rd', '15-08-2011', 'Female', '9')
+    roster.update(1, new)
+    index.update(1, old, new)
+    assert roster.row(1) == new
+    check_index(roster, index)
+
+
+def test_diff_by_roll_added_and_changed():
+    roster = Roster(ROSTER_COLUMNS, ROWS)
+    rolls = RollIndex(roster.column('Roll No.'))
+    changed_row = ROWS[2][:3] + ('Siliguri',) + ROWS[2][4:]
+    new_row = ('D/4', 'Tania Kar', 'Ajoy Kar', 'Kolkata', 'Music', '1st', '01-01-2012', 'Female', '98')
+    rows = [
+        ROWS[0],  # unchanged
+        changed_row,
+        new_row,
+        (' ',) + ROWS[1][1:],  # no roll
+        ('B/1',) + ROWS[0][1:],  # repeat of a roll earlier in the file
+    ]
+    added, changed = diff_by_roll(roster, rolls, rows)
+    assert added == [new_row]
+    assert changed == [(2, changed_row)]
+
+
+def test_index_after_batch_update_and_add():
+    roster = Roster(ROSTER_COLUMNS, ROWS[:3])
+    index = RosterIndex(roster)
+    check_index(roster, index)
+    changes = [
+        (2, ('B/1', 'Raju Roychowdhury', 'Kamal Roy', 'Kolkata', 'Music', 'Pr-2', '30-12-2009', 'Male', '1')),
+        (0, ('A/10', 'R', 'Amal Das', 'Kolkata', 'Tabla', '2nd', '01-02-2010', 'Female', '9800000010')),
+    ]
+    old_rows = [roster.row(i) for i, _ in changes]
+    roster.update_many(changes)
+    index.update_many([(i, old, row) for (i, row), old in zip(changes, old_rows)])
+    for i, row in changes:
+        assert roster.row(i) == row
+    check_index(roster, index)
+    roster.extend(ROWS[3:])
+    index.add_many(ROWS[3:])
+    check_index(roster, index)
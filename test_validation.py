@@ -0,0 +1,87 @@
+from student_store import ROSTER_COLUMNS, StudentStore
+from validation import (
+    RollIndex, ValidationReport, check_import_rolls, is_missing, iter_valid_admit_records, validate_admit_batch,
+)
+
+EXAM = {"Date": "01.03.2026", "Time (1st Part)": "10 AM", "Time (2nd Part)": "2 PM", "Place": "Hall"}
+
+
+def admit_row(roll, name="Rina Das", **fields):
+    row = {"Roll No.": roll, "Name": name, "Examination for": "Annual", "Year": "1st", "Subject": "Dance",
+           "Name of the Centre with Address": "Kolkata"}
+    row.update(fields)
+    return row
+
+
+def test_is_missing():
+    assert is_missing(None)
+    assert is_missing(float("nan"))
+    assert not is_missing("")
+    assert not is_missing("nan")
+    assert not is_missing(0.0)
+
+
+def test_check_import_rolls_skips_stored_and_repeated_rolls():
+    report = ValidationReport()
+    rows = [{"Roll No.": "A/1"}, {"Roll No.": "A/2"}, {"Roll No.": " A/2 "}, {"Roll No.": "A/3"}]
+    accepted = check_import_rolls(rows, RollIndex(["A/1"]), report, start=10)
+    assert accepted == [rows[1], rows[3]]
+    assert report.valid == 2
+    assert report.rejected == {10, 12}
+    assert [error.message for error in report.errors] == [
+        "Roll No. A/1 is already stored", "Duplicate Roll No. A/2 (first in row 11)"]
+
+
+def test_check_import_rolls_accepts_every_blank_roll():
+    report = ValidationReport()
+    rows = [{"Roll No.": float("nan")}, {"Roll No.": None}, {"Roll No.": "  "}, {}, {"Roll No.": float("nan")}]
+    assert check_import_rolls(rows, RollIndex(), report) == rows
+    assert report.ok
+    assert report.valid == len(rows)
+
+
+def test_import_csv_with_blank_rolls(tmp_path):
+    path = tmp_path / "students.csv"
+    path.write_text("Roll No.,Name\n,Rina Das\nA/1,Mitu Sen\n,Raju Roy\n,Rahul Pal\nA/1,Eva Ghosh\n",
+                    encoding="utf-8")
+    store = StudentStore(str(tmp_path / "students.db"), ROSTER_COLUMNS)
+    try:
+        report = store.import_excel(str(path), RollIndex())
+        assert report.valid == 4
+        assert report.rejected == {4}
+        assert [row[1] for row in store.iter_rows()] == ["Rina Das", "Mitu Sen", "Raju Roy", "Rahul Pal"]
+    finally:
+        store.close()
+
+
+def test_validate_admit_batch_rejects_bad_and_clashing_rows():
+    rows = [
+        admit_row("A/1"),
+        admit_row("A/1", name="Mitu Sen"),  # repeated roll
+        admit_row("A_1"),  # same card file name as row 0
+        admit_row("A/2", name="R1na"),  # bad name
+        admit_row("A/3", Subject=""),
+        admit_row("A/4", name="Mitu Sen"),
+    ]
+    report = validate_admit_batch(rows, EXAM)
+    assert report.valid == 2
+    assert report.rejected == {1, 2, 3, 4}
+    assert [error.field for error in report.errors] == ["Roll No.", "Roll No.", "Name", "Subject"]
+    assert [record["Roll No."] for record in iter_valid_admit_records(rows, report)] == ["A/1", "A/4"]
+
+
+def test_validate_admit_batch_bad_exam_rejects_everything():
+    rows = [admit_row("A/1")]
+    report = validate_admit_batch(rows, dict(EXAM, Date="2026-03-01"))
+    assert report.lines() == ["Date must be in DD.MM.YYYY format"]
+    assert list(iter_valid_admit_records(rows, report)) == []
+
+
+def test_report_lines_are_limited():
+    report = validate_admit_batch([admit_row("") for _ in range(5)], EXAM)
+    lines = report.lines(2)
+    assert lines == [
+        "Row 0: Invalid Roll No. (should be non-empty and alphanumeric)",
+        "Row 1: Invalid Roll No. (should be non-empty and alphanumeric)",
+        "... and 3 more",
+    ]
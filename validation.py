@@ -0,0 +1,235 @@
+import math
+import re
+from collections import namedtuple
+from datetime import datetime
+
+ADMIT_LABELS = [
+    "Roll No.", "Name", "Examination for", "Year", "Subject", "Name of the Centre with Address"
+]
+EXAM_LABELS = ["Date", "Time (1st Part)", "Time (2nd Part)", "Place"]
+
+# Rules compiled once at import instead of on every row
+ROLL_RE = re.compile(r"[\w/]+")
+NAME_RE = re.compile(r"[A-Za-z .'-]+")
+EXAM_DATE_RE = re.compile(r"\d{2}\.\d{2}\.\d{4}")
+PHONE_RE = re.compile(r"\d+")
+DOB_FORMAT = "%d-%m-%Y"
+PHONE_DIGITS = 10
+
+# Admit card fields that must not be empty, with their messages
+_REQUIRED_ADMIT = [
+    ("Examination for", "Examination for field cannot be empty"),
+    ("Year", "Year field cannot be empty"),
+    ("Subject", "Subject field cannot be empty"),
+    ("Name of the Centre with Address", "Centre/Address field cannot be empty"),
+]
+_REQUIRED_EXAM = [
+    ("Time (1st Part)", "Time (1st Part) cannot be empty"),
+    ("Time (2nd Part)", "Time (2nd Part) cannot be empty"),
+    ("Place", "Place field cannot be empty"),
+]
+
+# One problem found by validate_admit_batch; row is the 0-based data row, or None for exam details
+ValidationError = namedtuple("ValidationError", ["row", "field", "message"])
+
+
+def is_missing(value):
+    """True for an empty cell: readers return None or NaN for them, and pandas is not needed to tell."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def admit_card_stem(roll, name):
+    """File name of a card without folder and extension; shared with render.admit_card_path."""
+    return f"{roll.replace('/', '_')}_{name.replace(' ', '_')}_admit_card"
+
+
+def check_admit_row(admit_data):
+    """Return (field, message) for the first problem in one card's own fields, or None."""
+    if not admit_data["Roll No."] or not ROLL_RE.fullmatch(admit_data["Roll No."]):
+        return "Roll No.", "Invalid Roll No. (should be non-empty and alphanumeric)"
+    if not admit_data["Name"] or not NAME_RE.fullmatch(admit_data["Name"]):
+        return "Name", "Invalid Name (should contain only letters and spaces)"
+    for field, message in _REQUIRED_ADMIT:
+        if not admit_data[field]:
+            return field, message
+    return None
+
+
+def check_exam(exam_data):
+    """Return (field, message) for the first problem in the examination details, or None."""
+    if not EXAM_DATE_RE.fullmatch(exam_data["Date"]):
+        return "Date", "Date must be in DD.MM.YYYY format"
+    for field, message in _REQUIRED_EXAM:
+        if not exam_data[field]:
+            return field, message
+    return None
+
+
+def validate_admit_fields(admit_data, exam_data):
+    """
+    Check one admit card's fields.
+    :return: (valid, message) tuple
+    """
+    problem = check_admit_row(admit_data) or check_exam(exam_data)
+    return (False, problem[1]) if problem else (True, "")
+
+
+def validate_dob(date_str):
+    """Date of Birth as DD-MM-YYYY, not in the future. :return: (valid, message) tuple"""
+    try:
+        date = datetime.strptime(date_str, DOB_FORMAT)
+    except ValueError:
+        return False, "Date of Birth must be in format DD-MM-YYYY."
+    if date > datetime.now():
+        return False, "Date of Birth cannot be in the future."
+    return True, ""
+
+
+def validate_phone(phone_str):
+    """:return: (valid, message) tuple"""
+    if not PHONE_RE.fullmatch(phone_str):
+        return False, "Phone Number must contain only digits."
+    if len(phone_str) != PHONE_DIGITS:
+        return False, f"Phone Number must be {PHONE_DIGITS} digits."
+    return True, ""
+
+
+class RollIndex:
+    """
+    Hash index of roll numbers and admit card file names seen so far.
+    File names are compared case-insensitively, as on Windows, so two cards that
+    would overwrite each other are caught even when their rolls differ ("A/1", "A_1").
+    """
+
+    def __init__(self, rolls=()):
+        self.rolls = {}
+        self.filenames = {}
+        for row, roll in enumerate(rolls):
+            self.rolls.setdefault(roll.strip(), row)
+
+    def duplicate_roll(self, roll):
+        """Row already holding this roll number, or None."""
+        return self.rolls.get(roll.strip())
+
+    def check(self, roll, stem):
+        """Return (field, message) if the roll or the file name is taken, else None."""
+        row = self.rolls.get(roll.strip())
+        if row is not None:
+            return "Roll No.", f"Duplicate Roll No. {roll} (first in row {row})"
+        row = self.filenames.get(stem.lower())
+        if row is not None:
+            return "Roll No.", f"File name {stem} already used by row {row}"
+        return None
+
+    def add(self, roll, row, stem=None):
+        self.rolls.setdefault(roll.strip(), row)
+        if stem is not None:
+            self.filenames.setdefault(stem.lower(), row)
+
+
+class ValidationReport:
+    """
+    Result of validate_admit_batch. Only the problems are kept, not the valid rows,
+    so a large file is validated in bounded memory and then read again to render
+    (see iter_valid_admit_records).
+    :ivar errors: ValidationError tuples for the rejected rows
+    :ivar rejected: 0-based data rows that failed validation
+    :ivar rolls: RollIndex of the accepted rows
+    :ivar valid: Number of accepted rows
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.rejected = set()
+        self.rolls = RollIndex()
+        self.valid = 0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def lines(self, limit=None):
+        """Readable "Row n: message" lines, at most limit of them plus a count of the rest."""
+        shown = self.errors if limit is None else self.errors[:limit]
+        lines = [f"Row {error.row}: {error.message}" if error.row is not None else error.message
+                 for error in shown]
+        if len(shown) < len(self.errors):
+            lines.append(f"... and {len(self.errors) - len(shown)} more")
+        return lines
+
+
+def check_import_rolls(rows, rolls, report, start=0):
+    """
+    Filter imported rows by Roll No.: rows whose roll is already stored, or repeats
+    a roll earlier in the same file, are recorded in the report instead of returned.
+    Rows without a roll are not checked.
+    :param rows: Row dictionaries of one chunk
+    :param rolls: RollIndex of the stored students (not modified)
+    :param report: ValidationReport shared by all chunks of the file; its rolls hold the file's own
+    :param start: 0-based file row of the chunk's first row
+    :return: The accepted rows
+    """
+    accepted = []
+    for idx, row in enumerate(rows, start):
+        roll = row.get("Roll No.")
+        # Blank cells come back as NaN from CSV and .xls, which str() would turn into the roll "nan"
+        roll = "" if is_missing(roll) else str(roll).strip()
+        if roll:
+            if rolls.duplicate_roll(roll) is not None:
+                report.errors.append(ValidationError(idx, "Roll No.", f"Roll No. {roll} is already stored"))
+                report.rejected.add(idx)
+                continue
+            first = report.rolls.duplicate_roll(roll)
+            if first is not None:
+                report.errors.append(ValidationError(idx, "Roll No.", f"Duplicate Roll No. {roll} (first in row {first})"))
+                report.rejected.add(idx)
+                continue
+            report.rolls.add(roll, idx)
+        accepted.append(row)
+    report.valid += len(accepted)
+    return accepted
+
+
+def admit_record(row):
+    """Admit card fields of one data row, as strings."""
+    return {label: str(row[label]) if label in row else "" for label in ADMIT_LABELS}
+
+
+def validate_admit_batch(rows, exam_data):
+    """
+    Validate a whole admit card import in one pass before anything is rendered.
+    Besides the field rules, later rows repeating a Roll No. or producing the same
+    card file name as an earlier row are rejected, so no card overwrites another.
+    :param rows: Iterable of row dictionaries (e.g. ingest.iter_records)
+    :param exam_data: Dictionary with the "Annual Examination" fields, checked once
+    :return: ValidationReport
+    """
+    report = ValidationReport()
+    problem = check_exam(exam_data)
+    if problem:
+        report.errors.append(ValidationError(None, *problem))
+        return report
+    for idx, row in enumerate(rows):
+        admit_data = admit_record(row)
+        stem = admit_card_stem(admit_data["Roll No."], admit_data["Name"])
+        problem = check_admit_row(admit_data) or report.rolls.check(admit_data["Roll No."], stem)
+        if problem:
+            report.errors.append(ValidationError(idx, *problem))
+            report.rejected.add(idx)
+            continue
+        report.rolls.add(admit_data["Roll No."], idx, stem)
+        report.valid += 1
+    return report
+
+
+def iter_valid_admit_records(rows, report):
+    """
+    Yield the admit_data of the rows validate_admit_batch accepted, reading the file again.
+    :param rows: The same rows as validated, e.g. a fresh ingest.iter_records(iter_chunks(path))
+    """
+    if report.errors and report.errors[0].row is None:
+        # The examination details were rejected, so no card is valid
+        return
+    for idx, row in enumerate(rows):
+        if idx not in report.rejected:
+            yield admit_record(row)
@@ -0,0 +1,84 @@
+DEFAULT_ROW_HEIGHT = 20  # Used until the first item has been drawn and can be measured
+
+
+class VirtualTreeview:
+    """
+    Windowed rendering for a ttk.Treeview.
+    Only the visible rows plus a small buffer exist as Tk items; scrolling reuses
+    those items with new values. The vertical scrollbar reflects the full row
+    count, and filtering/sorting stay with the caller, which passes in the
+    already filtered and sorted rows.
+    :param tree: ttk.Treeview to render into
+    :param scrollbar: Vertical ttk.Scrollbar that drives the window
+    :param buffer_rows: Extra items kept below the visible window
+    """
+
+    def __init__(self, tree, scrollbar, buffer_rows=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.buffer_rows = buffer_rows
+        self.rows = []
+        self.first = 0
+        self.item_ids = []
+        self.row_height = None
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.config(command=self.yview)
+        self.tree.bind("<Configure>", lambda event: self.refresh())
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+
+    def set_rows(self, rows):
+        """
+        Replace the displayed rows.
+        :param rows: Sequence of row values (supports len() and indexing)
+        """
+        self.rows = rows
+        self.refresh()
+
+    def visible_count(self):
+        height = self.tree.winfo_height()
+        if self.item_ids:
+            bbox = self.tree.bbox(self.item_ids[0])
+            if bbox:
+                self.row_height = bbox[3]
+                return max(1, (height - bbox[1]) // self.row_height)
+        return max(1, height // (self.row_height or DEFAULT_ROW_HEIGHT))
+
+    def refresh(self):
+        visible = self.visible_count()
+        total = len(self.rows)
+        self.first = max(0, min(self.first, total - visible))
+        needed = min(visible + self.buffer_rows, total - self.first)
+        while len(self.item_ids) < needed:
+            self.item_ids.append(self.tree.insert("", "end"))
+        if len(self.item_ids) > needed:
+            self.tree.delete(*self.item_ids[needed:])
+            del self.item_ids[needed:]
+        for offset, iid in enumerate(self.item_ids):
+            self.tree.item(iid, values=list(self.rows[self.first + offset]))
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows):
+        self.first += rows
+        self.tree.selection_remove(*self.tree.selection())
+        self.refresh()
+        return "break"
+
+    def yview(self, *args):
+        # Same protocol as Treeview.yview so the scrollbar can drive it directly
+        visible = self.visible_count()
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.rows))
+            self.tree.selection_remove(*self.tree.selection())
+            self.refresh()
+        elif args[0] == "scroll":
+            step = visible if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
@@ -0,0 +1,57 @@
+import os
+
+WATCH_MS = 2000  # How often a watched file is checked
+
+
+class FileWatcher:
+    """
+    Watches a file for changes made by other programs (e.g. Excel) by polling its
+    size and modification time with root.after; a stat every couple of seconds is
+    cheap and behaves the same on every platform. on_change(path) runs on the Tk
+    thread once a change has settled, i.e. the file looked the same on two polls
+    in a row, so a workbook that is still being saved is not read half-written.
+    :param root: Tk window whose after() drives the polling
+    :param path: File to watch (it may not exist yet)
+    :param on_change: Callback(path)
+    """
+
+    def __init__(self, root, path, on_change, interval=WATCH_MS):
+        self.root = root
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.seen = self._signature()
+        self.pending = None
+        self._after = None
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        if self._after is None:
+            self._after = self.root.after(self.interval, self._poll)
+
+    def stop(self):
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+
+    def retry(self):
+        """Report the current file again after it settles, e.g. when it could not be read this time."""
+        self.seen = None
+        self.pending = None
+
+    def _poll(self):
+        signature = self._signature()
+        if signature is not None and signature != self.seen:
+            if signature == self.pending:
+                self.seen = signature
+                self.pending = None
+                self.on_change(self.path)
+            else:
+                self.pending = signature
+        self._after = self.root.after(self.interval, self._poll)